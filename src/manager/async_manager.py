@@ -0,0 +1,136 @@
+"""
+An asyncio front-end to the pipeline, for services running in an event loop. The processing stages run in an
+executor, by default the default executor of the event loop, and the IceParser is called through asyncio
+subprocess pipes, so the event loop is never blocked by the pipeline.
+
+Cancelling a call stops the remaining work: the stages are awaited one after another (for stream() one sentence
+after another), so no further stage is started after a cancellation, and a cancelled IceParser call kills the
+parser process. A stage already running in the executor finishes in the background, its result is discarded.
+
+Example:
+
+    manager = AsyncManager()
+    transcribed = await manager.transcribe('Snýst í suðaustan 10-18 m/s')
+    async for sentence in manager.stream(chunks):
+        ...
+    await manager.close()
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor
+
+from .iceparser_worker import AsyncIceParserWorker
+from .options import ProcessingOptions
+from .textprocessing_manager import Manager, ProcessedSentence, SentenceSplitter, PHRASE, STAGES
+
+# asyncio.get_running_loop() is new in Python 3.7, in a coroutine get_event_loop() returns the running loop
+get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class AsyncManager:
+
+    def __init__(self, manager: Manager=None, executor: Executor=None, persistent_parser=True):
+        """
+        :param manager: the Manager running the processing stages, a new Manager if None
+        :param executor: the executor for the processing stages, if None the default executor of the event loop
+        :param persistent_parser: if True, keep an IceParser process running, else phrasing runs iceparser.sh
+        in the executor for each call
+        """
+        self.owns_manager = manager is None
+        self.manager = manager if manager is not None else Manager()
+        self.executor = executor
+        self.parser = AsyncIceParserWorker() if persistent_parser else None
+
+    async def close(self):
+        """Stop the IceParser process, and close the Manager if it was created by this AsyncManager."""
+        if self.parser:
+            await self.parser.stop()
+        if self.owns_manager:
+            await self.run(self.manager.close)
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) in the executor."""
+        loop = get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def warm_up(self, stages=STAGES, spellcheck=False):
+        """Create the components of the Manager needed for 'stages', see Manager.warm_up(), and start the
+        IceParser."""
+        if self.parser is None:
+            await self.run(self.manager.warm_up, stages, spellcheck)
+            return
+        await self.run(self.manager.warm_up, [stage for stage in stages if stage != PHRASE], spellcheck)
+        if PHRASE in stages and not self.parser.is_alive():
+            await self.parser.start()
+
+    async def clean(self, text: str, html=False) -> list:
+        """See Manager.clean()."""
+        return await self.run(self.manager.clean, text, html)
+
+    async def normalize(self, text: str, html=False) -> list:
+        """See Manager.normalize()."""
+        clean = await self.clean(text, html)
+        return await self.run(self.manager.normalize_tokens, clean)
+
+    async def phrase(self, text: str, html=False) -> list:
+        """See Manager.phrase()."""
+        normalized = await self.normalize(text, html)
+        return await self.phrase_tokens(normalized)
+
+    async def phrase_tokens(self, normalized_tokens: list) -> list:
+        """See Manager.phrase_tokens()."""
+        if self.parser is None:
+            return await self.run(self.manager.phrase_tokens, normalized_tokens)
+        phrasing = self.manager.phrasing
+        parsed = await self.parser.parse(phrasing.tagged_lines(normalized_tokens))
+        return await self.run(phrasing.phrase_parsed, normalized_tokens, parsed)
+
+    async def transcribe(self, text: str, html=False, phrasing=True, spellcheck=False, cmu: bool=False,
+                         options: ProcessingOptions=None) -> list:
+        """See Manager.transcribe()."""
+        options = self.manager.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        normalized = await self.normalize(text, html)
+        if options.phrasing:
+            normalized = await self.phrase_tokens(normalized)
+        return await self.transcribe_tokens(normalized, options=options)
+
+    async def transcribe_tokens(self, tokens: list, spellcheck=False, cmu: bool=False,
+                                options: ProcessingOptions=None) -> list:
+        """See Manager.transcribe_tokens()."""
+        options = self.manager.call_options(options, spellcheck=spellcheck, cmu=cmu)
+        return await self.run(self.manager.transcribe_tokens, tokens, options=options)
+
+    async def stream(self, text_or_chunks, html=False, phrasing=True, spellcheck=False, cmu: bool=False,
+                     options: ProcessingOptions=None):
+        """
+        Process the input sentence by sentence and yield each sentence as soon as it is transcribed, see
+        Manager.stream(). The input can be a string, an iterable or an asynchronous iterable of text chunks.
+
+        :return: an asynchronous generator of ProcessedSentence objects, in the order of the input
+        """
+        options = self.manager.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        splitter = SentenceSplitter(self.manager, html)
+        async for chunk in self.iterate_chunks(text_or_chunks):
+            for sent in await self.run(splitter.feed, chunk):
+                yield await self.process_sentence(sent, options)
+        for sent in await self.run(splitter.finish):
+            yield await self.process_sentence(sent, options)
+
+    @staticmethod
+    async def iterate_chunks(text_or_chunks):
+        if isinstance(text_or_chunks, str):
+            yield text_or_chunks
+        elif hasattr(text_or_chunks, '__aiter__'):
+            async for chunk in text_or_chunks:
+                yield chunk
+        else:
+            for chunk in text_or_chunks:
+                yield chunk
+
+    async def process_sentence(self, tokenized: list, options: ProcessingOptions) -> ProcessedSentence:
+        """Normalize, phrase and transcribe a tokenized sentence, see Manager.process_sentence()."""
+        normalized = await self.run(self.manager.normalize_tokenized, tokenized)
+        if options.phrasing:
+            normalized = await self.phrase_tokens(normalized)
+        transcribed = await self.transcribe_tokens(normalized, options=options)
+        return ProcessedSentence.from_tokenized(tokenized, transcribed)
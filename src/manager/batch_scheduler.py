@@ -0,0 +1,152 @@
+"""
+A micro-batching scheduler in front of a Manager. Requests submitted from different threads within a short window
+are collected into one batch and processed with the batch methods of the Manager (normalize_batch(), phrase_batch(),
+transcribe_batch()), so a batch shares one phrasing round trip and one g2p pass over its distinct words. The
+results are returned to each caller through a Future.
+
+'max_batch_size' and 'max_wait' trade latency for throughput: a batch is processed as soon as it holds
+'max_batch_size' requests or 'max_wait' seconds after its first request arrived.
+
+Example:
+
+    scheduler = BatchScheduler(manager, max_batch_size=32, max_wait=0.005)
+    future = scheduler.submit('transcribe', 'Sunnan 4 m/s')
+    transcribed = future.result()
+    scheduler.close()
+"""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .options import ProcessingOptions
+from .textprocessing_manager import Manager
+
+DEFAULT_MAX_BATCH_SIZE = 32
+# seconds
+DEFAULT_MAX_WAIT = 0.005
+
+
+class BatchScheduler:
+
+    stages = ('clean', 'normalize', 'phrase', 'transcribe')
+
+    def __init__(self, manager: Manager, max_batch_size: int=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait: float=DEFAULT_MAX_WAIT):
+        """
+        :param manager: the Manager processing the batches
+        :param max_batch_size: the maximum number of requests in one batch
+        :param max_wait: the maximum time in seconds a request waits for further requests to join its batch
+        """
+        if max_batch_size < 1:
+            raise ValueError(f'max_batch_size has to be at least 1, got {max_batch_size}')
+        self.manager = manager
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.batch_count = 0
+        self.request_count = 0
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.closed = False
+
+    def submit(self, stage: str, text: str, html=False, options: ProcessingOptions=None) -> Future:
+        """
+        Submit 'text' to be processed up to and including 'stage' in the next batch.
+
+        :param stage: one of 'clean', 'normalize', 'phrase' or 'transcribe'
+        :param text: a raw text or html-text
+        :param html: if True, the text will be interpreted as html-string and parsed accordingly
+        :param options: settings for 'transcribe', the options of the manager if None
+        :return: a Future of the processed token list
+        """
+        if stage not in self.stages:
+            raise ValueError(f'unknown stage {stage}, valid stages are: {self.stages}')
+        if options is None:
+            options = self.manager.options
+        future = Future()
+        with self.thread_lock:
+            if self.closed:
+                raise RuntimeError('BatchScheduler is closed')
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='BatchScheduler', daemon=True)
+                self.thread.start()
+            self.requests.put((stage, text, html, options, future))
+        return future
+
+    def stats(self) -> dict:
+        return {'batches': self.batch_count, 'requests': self.request_count,
+                'mean_batch_size': self.request_count / self.batch_count if self.batch_count else 0.0}
+
+    def close(self):
+        """Process the requests already submitted and stop the scheduler thread."""
+        with self.thread_lock:
+            self.closed = True
+            thread = self.thread
+        if thread is not None:
+            self.requests.put(None)
+            thread.join()
+
+    def run(self):
+        stop = False
+        while not stop:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    request = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            try:
+                self.process_batch(batch)
+            except Exception as e:
+                # keep the scheduler running, the requests of the failed batch get the exception
+                logging.exception(f'error processing a batch of {len(batch)} requests')
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def process_batch(self, batch: list):
+        """Process the requests in 'batch', one batch call per stage, html setting and options."""
+        self.batch_count += 1
+        self.request_count += len(batch)
+        groups = OrderedDict()
+        for stage, text, html, options, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                groups.setdefault((stage, html, options), []).append((text, future))
+            except TypeError as e:
+                # unhashable option values, only this request fails
+                future.set_exception(ValueError(f'invalid options: {e}'))
+
+        for (stage, html, options), requests in groups.items():
+            texts = [text for text, _ in requests]
+            try:
+                results = self.process_texts(stage, texts, html, options)
+            except Exception as e:
+                logging.exception(f'error processing a batch of {len(texts)} requests')
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(requests, results):
+                future.set_result(result)
+
+    def process_texts(self, stage: str, texts: list, html: bool, options: ProcessingOptions) -> list:
+        if stage == 'clean':
+            return [self.manager.clean(text, html=html) for text in texts]
+        if stage == 'normalize':
+            return self.manager.normalize_batch(texts, html=html)
+        if stage == 'phrase':
+            return self.manager.phrase_batch(texts, html=html)
+        return self.manager.transcribe_batch(texts, html=html, options=options)
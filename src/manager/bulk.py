@@ -0,0 +1,164 @@
+"""
+Bulk processing for corpus preparation, started with:
+
+    process bulk [INPUT ...] [--stages clean normalize phrase transcribe] [--jobs N] [--output FILE]
+
+Each INPUT is a text file with one document per line, a directory, of which each file (recursively) is one
+document, or '-' for stdin with one document per line. Without INPUT, stdin is read. For each document one JSON
+record is written to the output (NDJSON), in the order of the input:
+
+    {"id": "corpus.txt:1", "clean": "...", "normalized": "...", "phrased": "...", "transcribed": "..."}
+
+The record holds the string representation of each stage in --stages, and with --tokens also the token lists.
+A document that can not be read or fails to process is written as {"id": ..., "error": ...}. Input is read and output written
+document by document, with only a bounded number of documents in flight, so memory use does not grow with the
+size of the input.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from collections import deque
+
+from .textprocessing_manager import Manager, CLEAN, NORMALIZE, PHRASE, TRANSCRIBE, STAGES
+
+# number of documents in flight per worker process
+DOCUMENTS_PER_JOB = 8
+
+# the Manager of the current process, see init_worker()
+_bulk_manager = None
+
+
+def init_worker(syllab_symbol: str):
+    global _bulk_manager
+    _bulk_manager = Manager()
+    _bulk_manager.set_g2p_syllab_symbol(syllab_symbol)
+
+
+def read_documents(inputs: list):
+    """Yield (id, text) for each document in 'inputs', see the module documentation. For a file that can not be
+    read or is not valid UTF-8, (path, error) is yielded with the exception as error, and reading continues with
+    the next file."""
+    for path in inputs or ['-']:
+        if path == '-':
+            yield from read_lines(sys.stdin, '<stdin>')
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    file_path = os.path.join(root, filename)
+                    try:
+                        with open(file_path, encoding='utf-8') as f:
+                            text = f.read()
+                    except (OSError, UnicodeDecodeError) as e:
+                        logging.error(f'error reading {file_path}: {e}')
+                        text = e
+                    yield file_path, text
+        else:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    yield from read_lines(f, path)
+            except (OSError, UnicodeDecodeError) as e:
+                logging.error(f'error reading {path}: {e}')
+                yield path, e
+
+
+def read_lines(lines, name: str):
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            yield f'{name}:{line_number}', line
+
+
+def process_document(doc: tuple, stages: list, html=False, spellcheck=False, cmu=False, tokens=False) -> str:
+    """Process a document (id, text) with the Manager of this process and return its record as a JSON string."""
+    doc_id, text = doc
+    manager = _bulk_manager
+    record = {'id': doc_id}
+    if isinstance(text, Exception):
+        # the document could not be read, see read_documents()
+        record['error'] = str(text)
+        return json.dumps(record, ensure_ascii=False)
+    try:
+        processed = manager.process(text, html=html, stages=stages, spellcheck=spellcheck, cmu=cmu)
+    except Exception as e:
+        logging.exception(f'error processing {doc_id}')
+        record['error'] = str(e)
+        return json.dumps(record, ensure_ascii=False)
+
+    if CLEAN in stages:
+        record['clean'] = manager.get_string_representation_clean(processed.clean)
+    if NORMALIZE in stages:
+        record['normalized'] = manager.get_string_representation_normalized(processed.normalized)
+    if PHRASE in stages:
+        record['phrased'] = manager.get_string_representation_normalized(processed.phrased, ignore_tags=False)
+    if TRANSCRIBE in stages:
+        record['transcribed'] = manager.get_string_representation_transcribed(processed.transcribed,
+                                                                              ignore_tags=False)
+    if tokens:
+        last = processed.transcribed or processed.phrased or processed.normalized or processed.clean
+        record['tokens'] = last
+    return json.dumps(record, ensure_ascii=False, default=lambda o: o.__dict__)
+
+
+def process_documents(documents, jobs: int=1, syllab_symbol='', **settings):
+    """
+    Process each document (id, text) in 'documents' and yield its JSON record, in the order of 'documents'.
+
+    :param documents: an iterable of (id, text) tuples
+    :param jobs: the number of worker processes, if 1 the documents are processed in this process
+    :param syllab_symbol: the syllable separator of transcriptions
+    :param settings: the keyword arguments of process_document()
+    :return: a generator of JSON strings
+    """
+    if jobs <= 1:
+        init_worker(syllab_symbol)
+        try:
+            for doc in documents:
+                yield process_document(doc, **settings)
+        finally:
+            _bulk_manager.close()
+        return
+
+    with multiprocessing.Pool(jobs, initializer=init_worker, initargs=(syllab_symbol,)) as pool:
+        # Pool.imap() would read the whole input ahead, keep the number of pending documents bounded instead
+        pending = deque()
+        for doc in documents:
+            pending.append(pool.apply_async(process_document, (doc,), settings))
+            if len(pending) >= jobs * DOCUMENTS_PER_JOB:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(prog='process bulk', description='process documents from files or stdin '
+                                                                      'and write NDJSON records')
+    parser.add_argument('inputs', nargs='*', help="text files (one document per line), directories (one document "
+                                                  "per file) or '-' for stdin, default stdin")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='the stages to run and write, processing stops after the last one given')
+    parser.add_argument('--jobs', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--output', help='output file, default stdout')
+    parser.add_argument('--html', action='store_true', help='interpret the documents as html')
+    parser.add_argument('--spellcheck', action='store_true', help='spellcheck before transcribing')
+    parser.add_argument('--cmu', action='store_true', help='write transcriptions in the CMU format')
+    parser.add_argument('--syllab-symbol', default='', help='syllable separator of transcriptions')
+    parser.add_argument('--tokens', action='store_true', help='also write the token list of the last stage')
+    return parser.parse_args(argv)
+
+
+def main(argv: list):
+    args = parse_args(argv)
+    records = process_documents(read_documents(args.inputs), jobs=args.jobs, syllab_symbol=args.syllab_symbol,
+                                stages=args.stages, html=args.html, spellcheck=args.spellcheck, cmu=args.cmu,
+                                tokens=args.tokens)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for record in records:
+            output.write(record + '\n')
+    finally:
+        if args.output:
+            output.close()
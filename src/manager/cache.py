@@ -0,0 +1,59 @@
+"""
+A bounded, thread-safe least-recently-used cache with hit/miss statistics, used by the managers to memoize
+results of expensive calls to the processing modules. Statistics are reported in the same format as
+functools.lru_cache.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """Maps keys to values, holding at most 'maxsize' entries. When full, the least recently used entry is
+    evicted. A maxsize of 0 disables the cache."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        """Return the value cached for 'key' and mark it as recently used, or 'default' if 'key' is not cached."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self.lock:
+            if self.maxsize <= 0:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def invalidate(self):
+        """Remove all entries, e.g. when the data the cached values are computed from changes. Statistics are kept."""
+        with self.lock:
+            self.entries.clear()
+
+    def cache_clear(self):
+        """Remove all entries and reset the statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -7,6 +7,7 @@ possibly contain TagTokens, created from SSML-tags inserted by the cleaner modul
 
 from .settings import PUNCTUATION
 
+from .cache import LRUCache, CacheInfo
 from .tokens import TagToken
 from .tokens_manager import init_tokens
 from text_cleaner import TextCleaner
@@ -17,16 +18,38 @@ CLOSING_PAR = ')'
 # SSML 1.1 standard
 SSML_LANG_START = '<lang xml:lang="en-GB">'
 SSML_LANG_END = '</lang>'
+# number of cleaned tokens to keep in memory, 0 disables the cache
+TOKEN_CACHE_SIZE = 50000
 
 
 class CleanerManager:
     """Connects the pipeline to the text-cleaner module and manages input and output"""
 
-    def __init__(self, repl_dict: dict, post_lookup_dict: dict, lexicon: list, alphabet: list, html_mapping: dict):
+    def __init__(self, repl_dict: dict, post_lookup_dict: dict, lexicon: list, alphabet: list, html_mapping: dict,
+                 cache_size: int=TOKEN_CACHE_SIZE):
+        """
+        :param cache_size: number of cleaned tokens to keep in memory, 0 disables the cache. The cache belongs to
+        the cleaner configured from the other parameters, a CleanerManager with another configuration has its own
+        """
         self.cleaner = TextCleaner(replacement_dict=repl_dict, post_dict=post_lookup_dict, preserve_strings=lexicon,
                                    punct_set=PUNCTUATION, alphabet=alphabet)
         self.html_cleaner = HtmlCleaner(tag_replacements=html_mapping)
         self.next_token_index = 0
+        # clean versions of raw tokens, see clean_token()
+        self.token_cache = LRUCache(cache_size)
+
+    def cache_info(self) -> CacheInfo:
+        """Hits, misses, maximum and current size of the cleaned tokens cache."""
+        return self.token_cache.cache_info()
+
+    def clean_token(self, token: str) -> str:
+        """Return the clean version of the raw token 'token'. Cleaning a token only depends on the token and the
+        configuration of the cleaner, so results are cached."""
+        clean_tok = self.token_cache.get(token)
+        if clean_tok is None:
+            clean_tok = self.cleaner.clean(token)
+            self.token_cache.put(token, clean_tok)
+        return clean_tok
 
     def clean_text(self, text: str) -> list:
         """The text attribute should be raw text, i.e. not html. Returns a list of tokens enriched with clean version
@@ -53,7 +76,7 @@ class CleanerManager:
         lang_tag = ''
         clean_tokens = []
         for token in token_list:
-            clean_tok = self.cleaner.clean(token.name)
+            clean_tok = self.clean_token(token.name)
             if clean_tok == EN_LABEL:
                 lang_tag = SSML_LANG_START
                 tag_tok = TagToken(lang_tag, token.token_index)
@@ -0,0 +1,77 @@
+"""
+A persistent cache for transcriptions of out-of-vocabulary words, i.e. words transcribed by the g2p model. The cache
+is stored in a local SQLite database, which several processes can read and append to concurrently. Each entry is
+stored with a version stamp of the pronunciation dictionary and the g2p model it was created with. Entries with a
+different version stamp are never returned, but they are kept, since other processes sharing the file may use
+other dictionaries. Call discard_stale() to remove them, e.g. during maintenance when no other version is in use.
+"""
+import json
+import sqlite3
+import threading
+
+# seconds to wait for a lock held by another process writing to the cache
+BUSY_TIMEOUT = 30
+# number of keys to look up in one query
+QUERY_SIZE = 500
+
+
+class PersistentG2PCache:
+
+    def __init__(self, filename: str, version: str):
+        self.filename = filename
+        self.version = version
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                                          isolation_level=None)
+        # write-ahead logging lets readers and a writer access the database at the same time
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS transcriptions '
+                                '(key TEXT, version TEXT, transcription TEXT, PRIMARY KEY (key, version))')
+
+    @staticmethod
+    def serialize_key(key: tuple) -> str:
+        return json.dumps(key, ensure_ascii=False)
+
+    def set_version(self, version: str):
+        """Change the version stamp, e.g. after the pronunciation dictionary has been changed."""
+        with self.lock:
+            self.version = version
+
+    def discard_stale(self):
+        """Delete all entries with another version stamp than the version of this cache, including the entries of
+        other processes using the file with other dictionaries."""
+        with self.lock:
+            self.connection.execute('DELETE FROM transcriptions WHERE version != ?', (self.version,))
+
+    def get_many(self, keys: list) -> dict:
+        """Return a dictionary with the cached transcriptions for the keys in 'keys' found in the cache."""
+        found = {}
+        serialized = {self.serialize_key(key): key for key in keys}
+        serialized_keys = list(serialized)
+        with self.lock:
+            # stay below SQLite's limit of host parameters per statement
+            for i in range(0, len(serialized_keys), QUERY_SIZE):
+                chunk = serialized_keys[i:i + QUERY_SIZE]
+                query = 'SELECT key, transcription FROM transcriptions WHERE version = ? AND key IN ({})'.format(
+                    ', '.join('?' * len(chunk)))
+                for key, transcription in self.connection.execute(query, [self.version] + chunk):
+                    found[serialized[key]] = transcription
+        return found
+
+    def put_many(self, entries: dict):
+        """Add the key-transcription pairs in 'entries' to the cache, in one transaction."""
+        if not entries:
+            return
+        rows = [(self.serialize_key(key), self.version, transcription) for key, transcription in entries.items()]
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.executemany('INSERT OR IGNORE INTO transcriptions VALUES (?, ?, ?)', rows)
+                self.connection.execute('COMMIT')
+            except sqlite3.Error:
+                self.connection.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
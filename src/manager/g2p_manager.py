@@ -4,37 +4,130 @@ a string in an input format for a TTS system. Following formats are supported:
 ...
 ...
 """
+import copy
+import hashlib
+import os
+import threading
+import weakref
 
 from .tokens import Token, Normalized, TagToken
-from ice_g2p.transcriber import Transcriber, G2P_METHOD
-from ice_g2p.g2p_lstm import ALPHABET, ENGLISH_ALPHABET
+from .cache import LRUCache, CacheInfo
+from .g2p_cache import PersistentG2PCache
+from .options import ProcessingOptions
 
 SIL_TOKEN = '<sil>'
 ENGLISH = 'enska'
+# number of word transcriptions to keep in memory, 0 disables the cache
+WORD_CACHE_SIZE = 20000
+# number of out-of-vocabulary words sent to the g2p model in one inference call, 0 transcribes word by word
+OOV_BATCH_SIZE = 64
+
+# version stamps of the dictionaries and g2p models of transcribers, computed once per transcriber,
+# see G2PManager.dictionary_version()
+_dictionary_versions = weakref.WeakKeyDictionary()
+_dictionary_versions_lock = threading.Lock()
 
 
 class G2PManager:
 
-    def __init__(self):
-        self.g2p = Transcriber(G2P_METHOD.FAIRSEQ, lang_detect=True, use_dict=True)
-        self.syllab_symbol = ''
-        self.stress = False
-        self.word_separator = ''
+    def __init__(self, cache_size: int=WORD_CACHE_SIZE, oov_batch_size: int=OOV_BATCH_SIZE, transcriber=None):
+        """
+        :param cache_size: number of word transcriptions to keep in memory, 0 disables the cache
+        :param oov_batch_size: number of out-of-vocabulary words sent to the g2p model in one inference call
+        :param transcriber: a Transcriber shared with other G2PManagers, see transcriber_view(). If None, a new
+        Transcriber is created, loading the g2p models
+        """
+        # ice_g2p loads torch and fairseq, only import it when a G2PManager is created
+        from ice_g2p.transcriber import Transcriber, G2P_METHOD
+        from ice_g2p.g2p_lstm import ALPHABET, ENGLISH_ALPHABET
+        if transcriber is None:
+            self.g2p = Transcriber(G2P_METHOD.FAIRSEQ, lang_detect=True, use_dict=True)
+        else:
+            self.g2p = self.transcriber_view(transcriber)
+        # the transcriber owning the core dictionaries used by this manager, see dictionary_version()
+        self.core_transcriber = transcriber if transcriber is not None else self.g2p
+        self.alphabet = set(ALPHABET).union(ENGLISH_ALPHABET)
+        self.oov_batch_size = oov_batch_size
+        # optional on-disk cache for transcriptions of out-of-vocabulary words, see set_persistent_cache()
+        self.persistent_cache_file = None
+        self.persistent_cache = None
+        self.persistent_cache_lock = threading.Lock()
+        # settings used if a call does not provide its own options
+        self.options = ProcessingOptions()
+        # transcriptions of single words, keyed by the word and all settings influencing the transcription
+        self.word_cache = LRUCache(cache_size)
+
+    @staticmethod
+    def transcriber_view(transcriber):
+        """
+        Return a shallow copy of 'transcriber' sharing the g2p models, the core pronunciation dictionaries and the
+        language detection with the original. The copy has its own settings, custom dictionary and automatic
+        transcriptions, since the g2p module looks up automatic transcriptions before the custom dictionary.
+        """
+        view = copy.copy(transcriber)
+        for attr in ('g2p', 'g2p_foreign'):
+            model = getattr(transcriber, attr, None)
+            if model is None:
+                continue
+            model = copy.copy(model)
+            model.custom_dict = None
+            if hasattr(model, 'automatic_g2p_dict'):
+                model.automatic_g2p_dict = {}
+            setattr(view, attr, model)
+        return view
 
     def set_core_pron_dict(self, pron_dict: dict):
         self.g2p.override_core_dict(pron_dict)
+        # the core dictionary is no longer the one of a shared transcriber
+        with _dictionary_versions_lock:
+            _dictionary_versions.pop(self.g2p, None)
+        self.core_transcriber = self.g2p
+        self.clear_automatic_transcriptions()
+        self.word_cache.invalidate()
+        if self.persistent_cache:
+            self.persistent_cache.set_version(self.dictionary_version())
 
     def set_custom_dict(self, pron_dict: dict):
         self.g2p.set_custom_dict(pron_dict)
+        self.clear_automatic_transcriptions()
+        self.word_cache.invalidate()
+
+    def clear_automatic_transcriptions(self):
+        """Remove the transcriptions the g2p models have stored for out-of-vocabulary words. The g2p module looks
+        them up before the dictionaries, so they have to be removed when a dictionary changes. Each G2PManager
+        has its own automatic transcriptions, see transcriber_view()."""
+        for model in (self.g2p.g2p, getattr(self.g2p, 'g2p_foreign', None)):
+            if model is not None and hasattr(model, 'automatic_g2p_dict'):
+                model.automatic_g2p_dict = {}
 
     def set_syllab_symbol(self, syllab_symbol: str):
-        self.g2p.syllab_symbol = syllab_symbol
+        self.options = self.options._replace(syllab_symbol=syllab_symbol)
 
     def set_stress(self, value: bool):
-        self.g2p.add_stress_label = value
+        self.options = self.options._replace(stress=value)
 
     def set_word_separator(self, word_sep: str):
-        self.g2p.word_separator = word_sep
+        self.options = self.options._replace(word_separator=word_sep)
+
+    def call_options(self, options: ProcessingOptions=None, **settings) -> ProcessingOptions:
+        """Return 'options' if given, else the settings of this manager with 'settings', the keyword arguments of
+        a call, see Manager.call_options()."""
+        if options is not None:
+            return options
+        return self.options._replace(**settings)
+
+    def options_view(self, options: ProcessingOptions):
+        """Return a shallow copy of the transcriber with the output settings of 'options'. The copy shares
+        models and dictionaries with the transcriber, so concurrent calls can use different options."""
+        view = copy.copy(self.g2p)
+        view.syllab_symbol = options.syllab_symbol
+        view.add_stress_label = options.stress
+        view.word_separator = options.word_separator
+        return view
+
+    def cache_info(self) -> CacheInfo:
+        """Hits, misses, maximum and current size of the word transcription cache."""
+        return self.word_cache.cache_info()
 
     def generate_normalized(self, word: str, token_ind: int) -> Token:
         """
@@ -51,11 +144,214 @@ class G2PManager:
         base_token.set_normalized([Normalized(word, 'n')])
         return base_token
 
-    def transcribe(self, token_list: list, cmu: bool=False) -> list:
+    def transcribe(self, token_list: list, cmu: bool=False, options: ProcessingOptions=None) -> list:
         """Transcribes the tokens in token_list and returns a list of
         transcribedTokens, keeps the tagTokens already in the input token_list, except for
-        the lang-SSML tag, which is used to transcribe English words using English g2p"""
+        the lang-SSML tag, which is used to transcribe English words using English g2p.
+        If 'options' is given, its settings are used instead of the settings of the manager and 'cmu'."""
+
+        return self.transcribe_batch([token_list], cmu=cmu, options=options)[0]
+
+    def transcribe_batch(self, token_lists: list, cmu: bool=False, options: ProcessingOptions=None) -> list:
+        """Transcribes each of the token lists in token_lists, see transcribe(). Each distinct word is only
+        sent once through the g2p module, regardless of how often it occurs in the lists.
+
+        :param token_lists: a list of normalized token lists, e.g. one list for each document of a batch
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing the settings of the manager and 'cmu'
+        :return: a list of transcribed token lists, in the same order as token_lists
+        """
+        options = self.call_options(options, cmu=cmu)
+        transcriber = self.options_view(options)
+        # transcriptions of the words in this batch, keyed by (word, icelandic)
+        transcribed_words = {}
+        words = set()
+        for token_list in token_lists:
+            words.update(self.collect_words(token_list))
+        # only words not transcribed before with these options need language detection and dictionary lookups
+        words = self.load_cached(words, options, transcribed_words)
+        oov_words = self.find_oov(words)
+        persistent_cache = self.open_persistent_cache()
+        if persistent_cache and oov_words:
+            self.load_persistent(persistent_cache, oov_words, options, transcribed_words)
+            oov_words = {key for key in oov_words if key not in transcribed_words}
+        self.transcribe_oov(oov_words)
+        transcribed_lists = [self.transcribe_token_list(token_list, transcribed_words, options, transcriber)
+                             for token_list in token_lists]
+        if persistent_cache and oov_words:
+            new_entries = {}
+            for word, icelandic in oov_words:
+                if (word, icelandic) in transcribed_words:
+                    new_entries[self.cache_key(word, icelandic, options)] = transcribed_words[(word, icelandic)]
+            persistent_cache.put_many(new_entries)
+        return transcribed_lists
+
+    def collect_words(self, token_list: list):
+        """Generate a tuple (word, icelandic) for each word in token_list that will be sent to the g2p module,
+        in the same way as transcribe_token_list() processes them."""
+        is_icelandic = True
+        for token in token_list:
+            if isinstance(token, TagToken):
+                if token.ssml_start:
+                    is_icelandic = False
+                    yield ENGLISH, True
+                elif token.ssml_end:
+                    is_icelandic = True
+            elif token.normalized:
+                for elem in token.normalized:
+                    if elem.pos == 'TAG':
+                        continue
+                    for word in elem.norm_str.split():
+                        if not word.startswith('<'):
+                            yield self.clean_word(word), is_icelandic
 
+    def load_cached(self, words: set, options: ProcessingOptions, transcribed_words: dict) -> set:
+        """Add the transcriptions of 'words' found in the word cache to transcribed_words and return the words
+        not found."""
+        uncached = set()
+        for word, icelandic in words:
+            transcribed = self.word_cache.get(self.cache_key(word, icelandic, options))
+            if transcribed is None:
+                uncached.add((word, icelandic))
+            else:
+                transcribed_words[(word, icelandic)] = transcribed
+        return uncached
+
+    def clean_word(self, word: str) -> str:
+        word = ''.join(c for c in word.lower() if c in self.alphabet)
+        return word.lower().strip()
+
+    def find_oov(self, words: set) -> set:
+        """Return the out-of-vocabulary words in 'words', i.e. the words transcribed by the g2p model.
+
+        :param words: a set of tuples (word, icelandic)
+        :return: the subset of 'words' that are not found in a pronunciation dictionary
+        """
+        if not getattr(self.g2p, 'use_dict', False):
+            return set()
+        return {(word, icelandic) for word, icelandic in words
+                if word and self.is_oov(self.get_model(word, icelandic), word)}
+
+    def transcribe_oov(self, words: set):
+        """
+        Transcribe the out-of-vocabulary words in 'words' with the g2p model, in batches of oov_batch_size words
+        instead of one inference call per word. The results are stored in the automatic transcriptions of the
+        g2p module, where they are found when the words are transcribed one by one afterwards.
+
+        :param words: a set of tuples (word, icelandic), as returned by find_oov()
+        """
+        if not self.oov_batch_size:
+            return
+        model_words = {}
+        for word, icelandic in words:
+            model = self.get_model(word, icelandic)
+            if word not in model.automatic_g2p_dict:
+                model_words.setdefault(id(model), (model, set()))[1].add(word)
+        for model, oov_words in model_words.values():
+            oov_words = sorted(oov_words)
+            for i in range(0, len(oov_words), self.oov_batch_size):
+                batch = oov_words[i:i + self.oov_batch_size]
+                transcribed = model.g2p_model.translate([' '.join(word) for word in batch])
+                for word, transcr in zip(batch, transcribed):
+                    model.automatic_g2p_dict[word] = transcr
+
+    def get_model(self, word: str, icelandic: bool):
+        """Return the g2p model the transcriber will use for 'word', see Transcriber.transcribe()."""
+        if icelandic:
+            icelandic = self.g2p.is_icelandic(word)
+        foreign = getattr(self.g2p, 'g2p_foreign', None)
+        if icelandic or foreign is None:
+            return self.g2p.g2p
+        return foreign
+
+    @staticmethod
+    def is_oov(model, word: str) -> bool:
+        """True if 'word' is transcribed by the neural model and not looked up in a dictionary."""
+        if not hasattr(model, 'g2p_model') or not hasattr(model, 'automatic_g2p_dict'):
+            # a g2p module not giving access to its model, words will be transcribed one by one
+            return False
+        if model.custom_dict and model.custom_dict.get(word):
+            return False
+        if model.pron_dict.get(word):
+            return False
+        # words containing characters not valid for the model are not transcribed
+        return not set(word).difference(model.alphabet)
+
+    @staticmethod
+    def cache_key(word: str, icelandic: bool, options: ProcessingOptions) -> tuple:
+        return word, icelandic, options.cmu, options.syllab_symbol, options.stress, options.word_separator
+
+    def set_persistent_cache(self, filename: str):
+        """Store transcriptions of out-of-vocabulary words in the SQLite database 'filename', shared with
+        other processes using the same file. Set to None to stop using a persistent cache."""
+        self.close()
+        self.persistent_cache_file = filename
+        self.open_persistent_cache()
+
+    def open_persistent_cache(self):
+        """Return the persistent cache, open it again if it has been closed by close(). None if no persistent
+        cache is set."""
+        with self.persistent_cache_lock:
+            if self.persistent_cache is None and self.persistent_cache_file:
+                self.persistent_cache = PersistentG2PCache(self.persistent_cache_file, self.dictionary_version())
+            return self.persistent_cache
+
+    def close(self):
+        """Close the connection to the persistent cache, it is opened again on the next call."""
+        with self.persistent_cache_lock:
+            if self.persistent_cache:
+                self.persistent_cache.close()
+                self.persistent_cache = None
+
+    def load_persistent(self, persistent_cache: PersistentG2PCache, words: set, options: ProcessingOptions,
+                        transcribed_words: dict):
+        """Look up 'words' in 'persistent_cache' and add the transcriptions found to transcribed_words and
+        the word cache."""
+        keys = {self.cache_key(word, icelandic, options): (word, icelandic) for word, icelandic in words}
+        for key, transcribed in persistent_cache.get_many(list(keys)).items():
+            transcribed_words[keys[key]] = transcribed
+            self.word_cache.put(key, transcribed)
+
+    def dictionary_version(self) -> str:
+        """A version stamp for the core pronunciation dictionaries and the g2p models, used to ignore
+        transcriptions in the persistent cache created with other dictionaries or models. Hashing the
+        dictionaries takes a while, the stamp is computed once per transcriber and shared by all managers using
+        the transcriber."""
+        with _dictionary_versions_lock:
+            version = _dictionary_versions.get(self.core_transcriber)
+            if version is None:
+                version = self.compute_dictionary_version(self.core_transcriber)
+                _dictionary_versions[self.core_transcriber] = version
+            return version
+
+    @staticmethod
+    def compute_dictionary_version(transcriber) -> str:
+        sha = hashlib.sha1()
+        for model in (transcriber.g2p, getattr(transcriber, 'g2p_foreign', None)):
+            if model is None:
+                continue
+            model_file = os.path.join(getattr(model, 'model_path', ''), getattr(model, 'model_file', ''))
+            sha.update(model_file.encode('utf-8'))
+            if os.path.isfile(model_file):
+                stat = os.stat(model_file)
+                sha.update(f'{stat.st_size}:{stat.st_mtime}'.encode('utf-8'))
+            for word, transcr in sorted(getattr(model, 'pron_dict', {}).items()):
+                sha.update(f'{word}\t{transcr}\n'.encode('utf-8'))
+        return sha.hexdigest()
+
+    def transcribe_word(self, word: str, icelandic: bool, options: ProcessingOptions, transcriber,
+                        transcribed_words: dict) -> str:
+        """Transcribe 'word' with 'transcriber', reuse the transcription from 'transcribed_words' if the word has
+        been transcribed in the current batch or was found in the word cache, see load_cached()."""
+        key = (word, icelandic)
+        if key not in transcribed_words:
+            transcribed = transcriber.transcribe(word, icelandic=icelandic, cmu=options.cmu)
+            self.word_cache.put(self.cache_key(word, icelandic, options), transcribed)
+            transcribed_words[key] = transcribed
+        return transcribed_words[key]
+
+    def transcribe_token_list(self, token_list: list, transcribed_words: dict, options: ProcessingOptions,
+                              transcriber) -> list:
         transcribed_list = []
         is_icelandic = True
         for token in token_list:
@@ -67,7 +363,7 @@ class G2PManager:
                     is_icelandic = False
                     transcribed_list.append(TagToken(SIL_TOKEN, token.token_index))
                     normalized = self.generate_normalized(ENGLISH, token.token_index)
-                    transcribed = self.g2p.transcribe(ENGLISH, cmu=cmu)
+                    transcribed = self.transcribe_word(ENGLISH, True, options, transcriber, transcribed_words)
                     normalized.set_transcribed([transcribed])
                     transcribed_list.append(normalized)
                     transcribed_list.append(TagToken(SIL_TOKEN, token.token_index))
@@ -90,11 +386,10 @@ class G2PManager:
                                 if word.startswith('<'):
                                     transcribed = word.strip()
                                 else:
-                                    word = ''.join(c for c in word.lower() if c in ALPHABET or c in ENGLISH_ALPHABET)
-                                    transcribed = self.g2p.transcribe(word.lower().strip(), icelandic=is_icelandic, cmu=cmu)
+                                    transcribed = self.transcribe_word(self.clean_word(word), is_icelandic,
+                                                                       options, transcriber, transcribed_words)
                                 transcribed_arr.append(transcribed.strip())
                 token.set_transcribed(transcribed_arr)
                 transcribed_list.append(token)
 
         return transcribed_list
-
@@ -0,0 +1,220 @@
+"""
+Keeps an IceParser JVM running for the lifetime of the phrasing manager. Starting the JVM and loading the IceNLP
+dictionaries takes a few seconds, so instead of calling iceparser.sh for each text to phrase, we start the parser
+once and communicate with it via stdin/stdout: one pos-tagged sentence per line in, one parsed sentence per line out.
+Each call ends its input with END_MARKER, a sentence that is only read back to check that the parser answered every
+line: if the number of parsed lines before it does not match the input, the call fails instead of waiting for lines
+that never come. If the JVM dies or fails, it is restarted on the next call. A worker can be shared between threads, each call to parse() holds
+the worker for a complete round trip so that sentences from concurrent calls never get mixed up.
+AsyncIceParserWorker does the same for asyncio applications, using asyncio subprocess pipes.
+"""
+import asyncio
+import logging
+import os
+import queue
+import subprocess
+import threading
+import weakref
+
+MANAGER_ROOT = os.path.dirname(os.path.abspath(__file__))
+ICEPARSER_DIR = os.path.join(MANAGER_ROOT, 'IceNLP/bat/iceparser')
+ICENLP_JAR = os.path.join(MANAGER_ROOT, 'IceNLP/dist/IceNLPCore.jar')
+ICEPARSER_MAIN = 'is.iclt.icenlp.runner.RunIceParser'
+# seconds to wait for a parsed line, the first call includes starting the JVM and loading the dictionaries
+PARSE_TIMEOUT = 60
+# maximum length of a line read from the parser by AsyncIceParserWorker
+MAX_LINE_LENGTH = 2 ** 24
+# a foreign word ('e'), sent after the sentences of each call, marks the end of the parser output for the call
+END_MARKER_WORD = 'iceparserworkerendmarker'
+END_MARKER = f'{END_MARKER_WORD} e'
+
+
+def is_end_marker(line: str) -> bool:
+    return END_MARKER_WORD in line.split()
+
+
+def check_line_count(parsed: list, lines: list):
+    if len(parsed) != len(lines):
+        raise RuntimeError(f'IceParser answered {len(parsed)} lines for {len(lines)} sentences')
+
+
+def _read_output(stream, lines: queue.Queue):
+    """Reader thread: put each line the parser writes to stdout in 'lines', None marks the end of the stream."""
+    for line in iter(stream.readline, ''):
+        lines.put(line.strip())
+    lines.put(None)
+
+
+def _terminate(process: subprocess.Popen):
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def _kill(process: asyncio.subprocess.Process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+class IceParserWorker:
+    """A long-running IceParser process, reading tagged sentences from stdin and writing parsed sentences to stdout."""
+
+    def __init__(self, java: str = 'java', timeout: int = PARSE_TIMEOUT):
+        self.command = [java, '-Dfile.encoding=UTF-8', '-classpath', ICENLP_JAR, ICEPARSER_MAIN]
+        self.timeout = timeout
+        self.process = None
+        self.output = None
+        self.finalizer = None
+        self.lock = threading.RLock()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start the IceParser JVM and a thread collecting its output."""
+        self.process = subprocess.Popen(self.command, cwd=ICEPARSER_DIR, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, encoding='utf-8', bufsize=1)
+        self.output = queue.Queue()
+        reader = threading.Thread(target=_read_output, args=(self.process.stdout, self.output), daemon=True)
+        reader.start()
+        # make sure the JVM does not outlive the worker or the interpreter
+        self.finalizer = weakref.finalize(self, _terminate, self.process)
+
+    def stop(self):
+        with self.lock:
+            if self.finalizer:
+                self.finalizer()
+            self.process = None
+            self.output = None
+            self.finalizer = None
+
+    def parse(self, tagged_lines: list) -> list:
+        """
+        Parse the pos-tagged sentences in 'tagged_lines' ('word tag word tag ...', one sentence per element) and
+        return the parsed sentences in the same order. If the parser has died or does not answer in time, it is
+        restarted and the sentences are sent once more. If that fails as well, the parser is stopped, so that its
+        remaining output can not be read as the answer to the next call, and the error is raised.
+
+        :param tagged_lines: pos-tagged sentences, empty lines are ignored
+        :return: a list of parsed sentences, one for each non-empty line in 'tagged_lines'
+        """
+        lines = [line.strip() for line in tagged_lines if line.strip()]
+        if not lines:
+            return []
+        with self.lock:
+            try:
+                return self.round_trip(lines)
+            except (OSError, RuntimeError) as e:
+                logging.warning(f'IceParser worker failed ({e}), restarting')
+                self.stop()
+                try:
+                    return self.round_trip(lines)
+                except (OSError, RuntimeError):
+                    self.stop()
+                    raise
+
+    def round_trip(self, lines: list) -> list:
+        if not self.is_alive():
+            self.start()
+        self.process.stdin.write('\n'.join(lines + [END_MARKER]) + '\n')
+        self.process.stdin.flush()
+        parsed = []
+        while True:
+            try:
+                line = self.output.get(timeout=self.timeout)
+            except queue.Empty:
+                raise RuntimeError(f'no answer from IceParser after {self.timeout} seconds')
+            if line is None:
+                raise RuntimeError('IceParser terminated unexpectedly')
+            if is_end_marker(line):
+                break
+            if line:
+                parsed.append(line)
+        check_line_count(parsed, lines)
+        return parsed
+
+
+class AsyncIceParserWorker:
+    """The asyncio version of IceParserWorker: a long-running IceParser process, reading tagged sentences from
+    stdin and writing parsed sentences to stdout, without blocking the event loop. If a call is cancelled while
+    waiting for the parser or its retry fails, the parser is killed, so it does not keep working on the cancelled sentences and
+    their output can not be mistaken for the answer to the next call. A worker must only be used from one
+    event loop."""
+
+    def __init__(self, java: str = 'java', timeout: int = PARSE_TIMEOUT):
+        self.command = [java, '-Dfile.encoding=UTF-8', '-classpath', ICENLP_JAR, ICEPARSER_MAIN]
+        self.timeout = timeout
+        self.process = None
+        self.finalizer = None
+        # created in the event loop of the first call
+        self.lock = None
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(*self.command, cwd=ICEPARSER_DIR,
+                                                            stdin=asyncio.subprocess.PIPE,
+                                                            stdout=asyncio.subprocess.PIPE, limit=MAX_LINE_LENGTH)
+        self.finalizer = weakref.finalize(self, _kill, self.process)
+
+    def kill(self):
+        if self.finalizer:
+            self.finalizer()
+        self.process = None
+        self.finalizer = None
+
+    async def stop(self):
+        process = self.process
+        self.kill()
+        if process is not None:
+            await process.wait()
+
+    async def parse(self, tagged_lines: list) -> list:
+        """
+        Parse the pos-tagged sentences in 'tagged_lines', see IceParserWorker.parse().
+
+        :param tagged_lines: pos-tagged sentences, empty lines are ignored
+        :return: a list of parsed sentences, one for each non-empty line in 'tagged_lines'
+        """
+        lines = [line.strip() for line in tagged_lines if line.strip()]
+        if not lines:
+            return []
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            try:
+                try:
+                    return await self.round_trip(lines)
+                except (OSError, RuntimeError) as e:
+                    logging.warning(f'IceParser worker failed ({e}), restarting')
+                    await self.stop()
+                    return await self.round_trip(lines)
+            except (asyncio.CancelledError, OSError, RuntimeError):
+                # cancelled or failed twice, the output of this call must not be read by the next one
+                self.kill()
+                raise
+
+    async def round_trip(self, lines: list) -> list:
+        if not self.is_alive():
+            await self.start()
+        self.process.stdin.write(('\n'.join(lines + [END_MARKER]) + '\n').encode('utf-8'))
+        await self.process.stdin.drain()
+        parsed = []
+        while True:
+            try:
+                line = await asyncio.wait_for(self.process.stdout.readline(), self.timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f'no answer from IceParser after {self.timeout} seconds')
+            if not line:
+                raise RuntimeError('IceParser terminated unexpectedly')
+            line = line.decode('utf-8').strip()
+            if is_end_marker(line):
+                break
+            if line:
+                parsed.append(line)
+        check_line_count(parsed, lines)
+        return parsed
@@ -7,23 +7,29 @@ the normalizer module, as well as pos-tags delivered by the normalizer module.
 import difflib
 
 from typing import Tuple
+from .cache import LRUCache, CacheInfo
 from .tokens import Normalized, TagToken
 from .tokens_manager import extract_sentences
 from .linked_tokens import LinkedTokens
 
-from regina_normalizer import abbr_functions
-from regina_normalizer import number_functions
+# the regina domain used for normalizing
+DOMAIN = 'other'
+# number of normalized sentences to keep in memory, 0 disables the cache
+SENTENCE_CACHE_SIZE = 10000
 
 
-class NormalizerManager:
+class AlignmentContext:
+    """The state of the alignment of one token list with its normalized version. Each call to
+    NormalizerManager.align_normalized() creates its own context, so the manager can be used from several threads
+    at once and does not keep references to processed token lists."""
 
-    def __init__(self):
-        # the final list of normalized tokens after processing by the normalizerManager
+    def __init__(self, pre_normalized: LinkedTokens, final_normalized: LinkedTokens):
+        # the final list of normalized tokens
         self.normalized_tokens = []
         # keep track of prenormalized and normalized elements during alignment of original token list and
         # the normalized token list
-        self.current_prenorm = None
-        self.current_norm = None
+        self.current_prenorm = pre_normalized.head
+        self.current_norm = final_normalized.head
 
     def update_current(self):
         if self.current_prenorm.next:
@@ -32,37 +38,66 @@ class NormalizerManager:
             if self.current_norm.visited:
                 self.current_norm = self.current_norm.next
 
+
+class NormalizerManager:
+
+    def __init__(self, cache_size: int=SENTENCE_CACHE_SIZE):
+        """
+        :param cache_size: number of normalized sentences to keep in memory, 0 disables the cache
+        """
+        # results of normalize(), keyed by sentence and domain
+        self.sentence_cache = LRUCache(cache_size)
+
+    def cache_info(self) -> CacheInfo:
+        """Hits, misses, maximum and current size of the normalized sentences cache."""
+        return self.sentence_cache.cache_info()
+
     def normalize_token_list(self, token_list: list) -> list:
         """Normalizes the text represented by the token list,
         assembles a new list of Tokens and TagTokens, if any are in the token list or if tags are added
         during normalization, each Token enriched by the normalizer results.
         The method to be called from the pipeline (textprocessing_manager)"""
 
-        pre_normalized = []
-        final_normalized = []
-        text_arr = extract_sentences(token_list)
-        for sent in text_arr:
-            if not sent:
-                continue
-            pre, final = self.normalize(sent)
-            pre_normalized.extend(pre)
-            final_normalized.extend(final)
+        return self.normalize_token_lists([token_list])[0]
 
-        pre_norm_linked = LinkedTokens()
-        pre_norm_linked.init_from_prenorm_tuples(pre_normalized)
-        norm_linked = LinkedTokens()
-        norm_linked.init_from_norm_tuples(final_normalized)
+    def normalize_token_lists(self, token_lists: list) -> list:
+        """Normalizes each of the token lists in token_lists, see normalize_token_list(). Sentences occurring
+        more than once in the token lists are only sent once through the normalizer.
 
-        self.align_normalized(token_list, pre_norm_linked, norm_linked)
+        :param token_lists: a list of tokenized token lists, e.g. one list for each document of a batch
+        :return: a list of normalized token lists, in the same order as token_lists
+        """
+        normalized_sentences = {}
+        normalized_lists = []
+        for token_list in token_lists:
+            pre_normalized = []
+            final_normalized = []
+            text_arr = extract_sentences(token_list)
+            for sent in text_arr:
+                if not sent:
+                    continue
+                if sent not in normalized_sentences:
+                    normalized_sentences[sent] = self.normalize(sent)
+                pre, final = normalized_sentences[sent]
+                pre_normalized.extend(pre)
+                final_normalized.extend(final)
+
+            pre_norm_linked = LinkedTokens()
+            pre_norm_linked.init_from_prenorm_tuples(pre_normalized)
+            norm_linked = LinkedTokens()
+            norm_linked.init_from_norm_tuples(final_normalized)
 
-        return self.normalized_tokens
+            normalized_lists.append(self.align_normalized(token_list, pre_norm_linked, norm_linked))
 
-    def normalize(self, text: str) -> Tuple:
+        return normalized_lists
+
+    def normalize(self, text: str, domain: str=DOMAIN) -> Tuple:
         """
         Normalize 'text' in two steps: first expand abbreviations and use that intermediate representation
         of 'text' as an input to the number normalizing step. Return results from both steps, organized in
         tuples with input and output of both steps, the number normalizing results also contain part-of-speech
-        tag for each token.
+        tag for each token. Both steps only depend on 'text' and 'domain', results are cached and returned for
+        repeated calls, so the returned lists must not be changed.
 
         Example:
         text, input first step normalizing: 'Jón , f. 4. apríl 1927 , d. 10. maí 2010'
@@ -76,14 +111,26 @@ class NormalizerManager:
         ('2010', ' tvö þúsund og tíu', 'ta')]
 
         :param text: the text to normalize
+        :param domain: the regina domain, 'other' or 'sport'
         :return: two lists of tuples, from both normalizing steps
         """
-        prenormalized = abbr_functions.replace_abbreviations(text, "other")
+        key = (text, domain)
+        result = self.sentence_cache.get(key)
+        if result is not None:
+            return result
+
+        # regina loads its lexicons on import, only import it when text is normalized
+        from regina_normalizer import abbr_functions
+        from regina_normalizer import number_functions
+
+        prenormalized = abbr_functions.replace_abbreviations(text, domain)
         prenorm_tuples = self.extract_prenorm_tuples(prenormalized, text.split())
         expanded_abbr = ' '.join(prenormalized).strip()
-        normalized = number_functions.handle_sentence(expanded_abbr, "other")
+        normalized = number_functions.handle_sentence(expanded_abbr, domain)
 
-        return prenorm_tuples, normalized
+        result = prenorm_tuples, normalized
+        self.sentence_cache.put(key, result)
+        return result
 
     def extract_prenorm_tuples(self, prenorm_arr: list, sent_arr: list) -> list:
         """
@@ -167,7 +214,7 @@ class NormalizerManager:
 
         return tup_list
 
-    def align_normalized(self, token_list: list, pre_normalized: LinkedTokens, final_normalized: LinkedTokens):
+    def align_normalized(self, token_list: list, pre_normalized: LinkedTokens, final_normalized: LinkedTokens) -> list:
         """Use all three input lists to enrich the tokens in token_list with normalized representations
         of the original tokens. Return a new list containing the same tokens as in token_list, enriched
         with normalized elements, and possibly added TagTokens, if created from normalized results.
@@ -179,39 +226,39 @@ class NormalizerManager:
         :param final_normalized: a linked list of normalized nodes (final results from the normalizer)
         :return a list of the tokens in token_list, enriched by normalized elements
         """
-        self.normalized_tokens = []
-        self.current_prenorm = pre_normalized.head
-        self.current_norm = final_normalized.head
+        context = AlignmentContext(pre_normalized, final_normalized)
         token_list_index = 0
         # iterate through the original tokens and extend each token with its normalized version, if exists
         while token_list_index < len(token_list):
             tok = token_list[token_list_index]
             if isinstance(tok, TagToken):
-                self.normalized_tokens.append(tok)
+                context.normalized_tokens.append(tok)
                 token_list_index += 1
                 continue
             else:
                 if not tok.tokenized:
                     # The original token might have been deleted during the cleaning step, so no
                     # further processing will have taken place. We keep the original token in the list for the record
-                    self.normalized_tokens.append(tok)
+                    context.normalized_tokens.append(tok)
                     # don't increment normalized lists in this case, they will not have a corresponding entry
                     token_list_index += 1
                     continue
                 else:
-                    self.process_token(tok)
+                    self.process_token(context, tok)
 
             token_list_index += 1
-            self.update_current()
+            context.update_current()
 
-    def process_token(self, token):
+        return context.normalized_tokens
+
+    def process_token(self, context: AlignmentContext, token):
         """Processes the 'token' and enriches with normalized version. Updates the normalized_tokens list.
         """
         # init several variables for more readable code below
         tokenized_token = ' '.join(token.tokenized)
-        token_is_prenorm_input = (tokenized_token == self.current_prenorm.token)
-        token_is_norm_input = (tokenized_token == self.current_norm.token)
-        prenorm_is_norm_input = (self.current_prenorm.processed == self.current_norm.token)
+        token_is_prenorm_input = (tokenized_token == context.current_prenorm.token)
+        token_is_norm_input = (tokenized_token == context.current_norm.token)
+        prenorm_is_norm_input = (context.current_prenorm.processed == context.current_norm.token)
 
         # The original (tokenized) token is the same as the input for the final normalizing step,
         # the normalized version contains one ore more tokens:
@@ -226,79 +273,79 @@ class NormalizerManager:
         # if it has changed the token or not
         if token_is_norm_input or (token_is_prenorm_input and prenorm_is_norm_input):
             normalized_arr = []
-            for word in self.current_norm.processed.split():
-                normalized_arr = self.extend_norm_arr(self.current_norm, normalized_arr, word)
-            self.update_alignment(normalized_arr, token, set_visited=True)
+            for word in context.current_norm.processed.split():
+                normalized_arr = self.extend_norm_arr(context.current_norm, normalized_arr, word)
+            self.update_alignment(context, normalized_arr, token, set_visited=True)
 
         # Did the pre normalization step expand an abbreviation to more tokens? This means that the input
         # for the final normalizing has more tokens than the original (for the example: 3 instead of 1)
         # Iterate through the tokens in the prenorm-results and the corresponding elements in the normalized list.
         # ['m/s'] vs. (m/s, metrar á sekúndu)
-        elif token_is_prenorm_input and len(self.current_prenorm.processed.split()) > 1:
+        elif token_is_prenorm_input and len(context.current_prenorm.processed.split()) > 1:
             normalized_arr = []
-            for j, word in enumerate(self.current_prenorm.processed.split()):
-                if self.current_norm.token == word:
-                    norm_word =self.current_norm.processed
-                    normalized_arr = self.extend_norm_arr(self.current_norm, normalized_arr, norm_word)
-                    if self.current_norm.next:
-                       self.current_norm.visited = True
-                       self.current_norm = self.current_norm.next
+            for j, word in enumerate(context.current_prenorm.processed.split()):
+                if context.current_norm.token == word:
+                    norm_word =context.current_norm.processed
+                    normalized_arr = self.extend_norm_arr(context.current_norm, normalized_arr, norm_word)
+                    if context.current_norm.next:
+                       context.current_norm.visited = True
+                       context.current_norm = context.current_norm.next
                 else:
                     break
-            self.update_alignment(normalized_arr, token)
+            self.update_alignment(context, normalized_arr, token)
 
         # Did the tokenizer split up the original token, so the original token tokenized spans more than
         # one entry in pre_normalized list?
         # original token: '10-12', tokenized: ['10','-','12'], tokenized_token: '10 - 12'
         # prenorm: (10, 10), (-, til), (12, 12)
-        elif tokenized_token.startswith(self.current_prenorm.token):
-            normalized_arr = self.process_split_token(token)
-            self.update_alignment(normalized_arr, token)
-            self.current_prenorm = self.current_prenorm.previous
+        elif tokenized_token.startswith(context.current_prenorm.token):
+            normalized_arr = self.process_split_token(context, token)
+            self.update_alignment(context, normalized_arr, token)
+            context.current_prenorm = context.current_prenorm.previous
 
-    def process_split_token(self, token):
+    def process_split_token(self, context: AlignmentContext, token):
         """Process a token that was split up by the tokenizer and thus has more than one input elements
         to the pre-normalizer"""
 
         normalized_arr = []
         original_arr = token.tokenized
         while original_arr:
-            if self.current_norm.visited:
+            if context.current_norm.visited:
                 break
             # did the pre-norm process split up the token in tok.tokenized?
-            no_prenorm_tokens = len(self.current_prenorm.processed.split())
+            no_prenorm_tokens = len(context.current_prenorm.processed.split())
             original_tok_rest = ''.join(original_arr)
-            original_arr = self.update_original_arr(original_arr)
-            pre_norm_arr = self.current_prenorm.processed.split()
+            original_arr = self.update_original_arr(context, original_arr)
+            pre_norm_arr = context.current_prenorm.processed.split()
             pre_norm_str = ''.join(pre_norm_arr)
-            if original_tok_rest.startswith(pre_norm_str) or self.current_prenorm.processed.startswith(
-                    self.current_norm.token):
+            if original_tok_rest.startswith(pre_norm_str) or context.current_prenorm.processed.startswith(
+                    context.current_norm.token):
                 for k in range(no_prenorm_tokens):
-                    norm_word = self.current_norm.processed.strip()
-                    self.current_norm.visited = True
-                    normalized_arr = self.extend_norm_arr(self.current_norm, normalized_arr, norm_word)
-                    if self.current_norm.next:
-                        self.current_norm = self.current_norm.next
+                    norm_word = context.current_norm.processed.strip()
+                    context.current_norm.visited = True
+                    normalized_arr = self.extend_norm_arr(context.current_norm, normalized_arr, norm_word)
+                    if context.current_norm.next:
+                        context.current_norm = context.current_norm.next
                     else:
                         break
             else:
                 # We should not get here!
                 print('original_token: ' + token.name)
-                print('prenormalized: ' + self.current_prenorm.processed)
+                print('prenormalized: ' + context.current_prenorm.processed)
 
-            self.update_current()
+            context.update_current()
         return normalized_arr
 
-    def update_alignment(self, normalized_arr, token, set_visited=False):
+    def update_alignment(self, context: AlignmentContext, normalized_arr, token, set_visited=False):
         token.set_normalized(normalized_arr)
-        self.normalized_tokens.append(token)
-        self.current_norm.visited = set_visited
+        context.normalized_tokens.append(token)
+        context.current_norm.visited = set_visited
 
-    def update_original_arr(self, original_arr):
-        """Remove the elements occurring in theself.current_prenorm tokens from the original array to ensure
+    def update_original_arr(self, context: AlignmentContext, original_arr):
+        """Remove the elements occurring in the current prenorm tokens from the original array to ensure
         we are not going ahead of the original token with the normalized elements. When the original_arr
-        is empty, we stop theself.current process and move on to the next token."""
-        increment_for_orig_arr = len(self.current_prenorm.token.split())
+        is empty, we stop the current process and move on to the next token."""
+        increment_for_orig_arr = len(context.current_prenorm.token.split())
         if increment_for_orig_arr < len(original_arr):
             original_arr = original_arr[increment_for_orig_arr:]
         else:
@@ -0,0 +1,28 @@
+"""
+Options for a single call to the pipeline. A ProcessingOptions object is immutable, so one Manager can serve
+concurrent calls with different output formats: each call gets its own options instead of changing settings
+shared by all calls. Use _replace() to derive options with some fields changed:
+
+    options = ProcessingOptions(syllab_symbol='.')
+    with_stress = options._replace(stress=True)
+"""
+from collections import namedtuple
+
+_ProcessingOptions = namedtuple('ProcessingOptions', ['syllab_symbol', 'stress', 'word_separator', 'cmu',
+                                                      'phrasing', 'spellcheck'])
+
+
+class ProcessingOptions(_ProcessingOptions):
+    """
+    :param syllab_symbol: if not empty, syllabify transcriptions using this symbol as a syllable separator
+    :param stress: if True, add stress labels to syllabified transcriptions
+    :param word_separator: if not empty, insert this separator between transcribed words
+    :param cmu: if True, return transcriptions in the CMU format
+    :param phrasing: if True, perform phrasing after normalizing
+    :param spellcheck: if True, perform spellcheck before transcribing
+    """
+    __slots__ = ()
+
+    def __new__(cls, syllab_symbol: str='', stress: bool=False, word_separator: str='', cmu: bool=False,
+                phrasing: bool=True, spellcheck: bool=False):
+        return super().__new__(cls, syllab_symbol, stress, word_separator, cmu, phrasing, spellcheck)
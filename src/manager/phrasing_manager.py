@@ -2,18 +2,46 @@
 Handles the communication with the phrasing module. The result of the phrasing methods in phrasing_manager is
 a list of NormalizedTokens, the same as the input from the normalizer_manager. The phrasing module adds TagTokens
 where it assumes a good place for a speech pause.
+
+The phrasing manager does not change the working directory of the process nor uses shared scratch files, so
+it can be called from several threads or processes at once.
 """
+import copy
 import os
+import subprocess
+import tempfile
 from .tokens import Token, TagToken
 from .tokens_manager import extract_tagged_text
-from phrasing.phrasing import Phrasing
+from .iceparser_worker import IceParserWorker, ICEPARSER_DIR
 
 # used to replace punctuation in normalized text if we don't perform real phrasing analysis
 SIL_TAG = '<sil>'
 
 
+def create_phraser():
+    # the phrasing module is only imported when text is phrased, to keep importing the manager package fast
+    from phrasing.phrasing import Phrasing
+    return Phrasing()
+
+
 class PhrasingManager:
 
+    def __init__(self, persistent_parser=True):
+        # if persistent_parser is True, keep one IceParser JVM alive instead of starting iceparser.sh on each call
+        self.parser = IceParserWorker() if persistent_parser else None
+
+    def warm_up(self):
+        """Start the IceParser worker now instead of on the first call to the phrasing."""
+        if self.parser and not self.parser.is_alive():
+            with self.parser.lock:
+                if not self.parser.is_alive():
+                    self.parser.start()
+
+    def close(self):
+        """Stop the IceParser worker, if running. It will be restarted if the phrasing is called again."""
+        if self.parser:
+            self.parser.stop()
+
     @staticmethod
     def get_punct_index(tok: Token):
         if isinstance(tok, TagToken):
@@ -25,29 +53,75 @@ class PhrasingManager:
         return ind_arr
 
     def phrase_text(self, tagged_text: str):
-        MANAGER_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-        PROJECT_ROOT, tail = os.path.split(MANAGER_PROJECT_ROOT)
-        os.chdir(PROJECT_ROOT + '/manager/IceNLP/bat/iceparser')
-        print('PROJECT_ROOT: ' + PROJECT_ROOT)
-        with open('tagged_tmp.txt', 'w') as f:
-            f.write(tagged_text)
-        comm = './iceparser.sh -i tagged_tmp.txt -o ../../../parsed_tmp.txt'
-        os.system(comm)
-        os.remove('tagged_tmp.txt')
-        os.chdir(PROJECT_ROOT)
-        with open(PROJECT_ROOT + '/manager/parsed_tmp.txt') as file:
-            lines = [line.strip() for line in file]
-        phraser = Phrasing()
+        lines = self.parse_lines(tagged_text.split('\n'))
+        phraser = create_phraser()
         paused_text = phraser.insert_pauses(lines)
-        os.remove(PROJECT_ROOT + '/manager/parsed_tmp.txt')
 
         return paused_text
 
+    def parse_lines(self, tagged_lines: list) -> list:
+        """Run the IceParser on the pos-tagged sentences in tagged_lines, return one parsed sentence for each
+        non-empty line."""
+        if self.parser:
+            return self.parser.parse(tagged_lines)
+        parsed = self.parse_with_script('\n'.join(tagged_lines))
+        return [line for line in parsed if line]
+
+    @staticmethod
+    def parse_with_script(tagged_text: str) -> list:
+        """Start the IceParser via iceparser.sh for a single call, the parser is not kept alive. Input and output
+        files are written to a temporary directory unique to this call."""
+        with tempfile.TemporaryDirectory(prefix='iceparser_') as tmp_dir:
+            tagged_file = os.path.join(tmp_dir, 'tagged.txt')
+            parsed_file = os.path.join(tmp_dir, 'parsed.txt')
+            with open(tagged_file, 'w') as f:
+                f.write(tagged_text)
+            subprocess.run(['./iceparser.sh', '-i', tagged_file, '-o', parsed_file], cwd=ICEPARSER_DIR, check=True)
+            with open(parsed_file) as file:
+                lines = [line.strip() for line in file]
+
+        return lines
+
     def phrase_token_list(self, normalized_tokens: list) -> list:
         """Send the pos-tagged text in normalized tokens through
         the phrasing module and returns the list with inserted TagTokens where appropriate."""
         tagged_text = extract_tagged_text(normalized_tokens)
         phrased = self.phrase_text(tagged_text)
+        return self.align_phrased(normalized_tokens, phrased)
+
+    def phrase_token_lists(self, token_lists: list) -> list:
+        """Phrase each of the normalized token lists in token_lists, see phrase_token_list(). The sentences of
+        all lists are sent to the IceParser in one round trip.
+
+        :param token_lists: a list of normalized token lists, e.g. one list for each document of a batch
+        :return: a list of phrased token lists, in the same order as token_lists
+        """
+        tagged_lists = [self.tagged_lines(normalized_tokens) for normalized_tokens in token_lists]
+        parsed = self.parse_lines([line for tagged_lines in tagged_lists for line in tagged_lines])
+
+        phrased_lists = []
+        parsed_index = 0
+        for normalized_tokens, tagged_lines in zip(token_lists, tagged_lists):
+            parsed_lines = parsed[parsed_index:parsed_index + len(tagged_lines)]
+            parsed_index += len(tagged_lines)
+            phrased_lists.append(self.phrase_parsed(normalized_tokens, parsed_lines))
+        return phrased_lists
+
+    @staticmethod
+    def tagged_lines(normalized_tokens: list) -> list:
+        """Return the pos-tagged sentences of 'normalized_tokens', the input lines for the IceParser."""
+        tagged_text = extract_tagged_text(normalized_tokens)
+        return [line.strip() for line in tagged_text.split('\n') if line.strip()]
+
+    def phrase_parsed(self, normalized_tokens: list, parsed_lines: list) -> list:
+        """Insert pauses into 'normalized_tokens' according to 'parsed_lines', the IceParser output for the
+        lines returned by tagged_lines()."""
+        phrased = create_phraser().insert_pauses(parsed_lines)
+        return self.align_phrased(normalized_tokens, phrased)
+
+    def align_phrased(self, normalized_tokens: list, phrased: list) -> list:
+        """Insert the pause tags from the phrasing results in 'phrased' as TagTokens into normalized_tokens.
+        Tokens whose normalized version changes are copied, 'normalized_tokens' is left untouched."""
         phrased_list = []
         #TODO: should we maintain sentence structure or only use one string for the whole input?
         for sent in phrased:
@@ -72,6 +146,8 @@ class PhrasingManager:
                 # if we have a 'pure' punctuation token, do nothing further, but if the tag-token was added
                 # in between tokens as a result of phrasing, remove the punctuation token from the normalized list and
                 # add the token to the list as well
+                token = copy.copy(token)
+                token.set_normalized(list(token.normalized))
                 for i, normalized in enumerate(token.normalized):
                     if normalized.pos in ['.', ',', 'pg', 'pa', 'pl'] or token.name == '/':
                         token.normalized.remove(normalized)
@@ -0,0 +1,224 @@
+"""
+A precompiled binary bundle of the resources in ManagerResources: the pronunciation dictionary and the abbreviation
+lists. Parsing the resource files on each start of the pipeline takes time and memory for each process, the bundle
+is memory-mapped instead, so lookups read directly from the file and the pages are shared between processes.
+
+Build (or rebuild) the bundle after changing any of the resource files:
+
+    python -m manager.resource_bundle
+
+The bundle stores a checksum of the contents of the resource files it was built from, and a stamp of the files, a
+hash of path, size and modification time of each file. The stamp is checked first, it does not read the files. Only
+if the stamp differs, e.g. after a new checkout of the files, the checksum of the current resource files is computed
+and compared. If the bundle is missing or the checksum does not match either, ManagerResources falls back to
+reading the resource files. Rebuilding the bundle updates the stamp.
+
+Bundle format (all integers unsigned 32 bit, little endian):
+    magic (8 bytes), stamp (20 bytes sha1), checksum (20 bytes sha1), number of tables
+    for each table: offset and size of the table in the file
+    each table: number of strings n, n+1 offsets relative to the start of the string data, utf-8 string data
+The string tables hold: pronunciation dictionary keys (sorted), the corresponding transcriptions, abbreviations
+(sorted), non-ending abbreviations (sorted).
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping, Set
+
+MAGIC = b'TTSRB\x00\x02\x00'
+CHECKSUM_SIZE = 20
+HEADER = struct.Struct('<8s20s20sI')
+TABLE_ENTRY = struct.Struct('<II')
+UINT = struct.Struct('<I')
+
+PRON_DICT_KEYS = 0
+PRON_DICT_VALUES = 1
+ABBREVIATIONS = 2
+NONENDING_ABBREVIATIONS = 3
+NUMBER_OF_TABLES = 4
+
+
+def files_checksum(filenames: list) -> bytes:
+    """A hash of the contents of the files in 'filenames'."""
+    sha = hashlib.sha1()
+    for fn in filenames:
+        with open(fn, 'rb') as f:
+            sha.update(f.read())
+    return sha.digest()
+
+
+def files_stamp(filenames: list) -> bytes:
+    """A hash of path, size and modification time of the files in 'filenames', changes when a file is changed
+    without reading the files."""
+    sha = hashlib.sha1()
+    for fn in filenames:
+        stat = os.stat(fn)
+        sha.update(f'{fn}\t{stat.st_size}\t{stat.st_mtime_ns}\n'.encode('utf-8'))
+    return sha.digest()
+
+
+class StringTable:
+    """A read-only sequence of strings stored in a memory-mapped buffer."""
+
+    def __init__(self, buffer: mmap.mmap, offset: int):
+        self.buffer = buffer
+        self.size = UINT.unpack_from(buffer, offset)[0]
+        self.offsets = memoryview(buffer)[offset + UINT.size:offset + UINT.size * (self.size + 2)].cast('I')
+        self.data_start = offset + UINT.size * (self.size + 2)
+
+    def __len__(self):
+        return self.size
+
+    def raw(self, index: int) -> bytes:
+        return self.buffer[self.data_start + self.offsets[index]:self.data_start + self.offsets[index + 1]]
+
+    def __getitem__(self, index: int) -> str:
+        return self.raw(index).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def find(self, string: str) -> int:
+        """Binary search for 'string' in a sorted table, return its index or -1 if not found."""
+        key = string.encode('utf-8')
+        low = 0
+        high = self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.raw(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self.raw(low) == key:
+            return low
+        return -1
+
+
+class BundleSet(Set):
+    """A set of strings backed by a sorted string table."""
+
+    def __init__(self, table: StringTable):
+        self.table = table
+
+    def __contains__(self, item):
+        return isinstance(item, str) and self.table.find(item) >= 0
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class BundleDict(Mapping):
+    """A dictionary of strings backed by a sorted key table and a value table."""
+
+    def __init__(self, keys: StringTable, values: StringTable):
+        self.keys_table = keys
+        self.values_table = values
+
+    def __getitem__(self, key):
+        index = self.keys_table.find(key) if isinstance(key, str) else -1
+        if index < 0:
+            raise KeyError(key)
+        return self.values_table[index]
+
+    def __iter__(self):
+        return iter(self.keys_table)
+
+    def __len__(self):
+        return len(self.keys_table)
+
+
+class ResourceBundle:
+    """Memory-mapped resource bundle, see module documentation for the format."""
+
+    def __init__(self, buffer: mmap.mmap):
+        self.buffer = buffer
+        _, _, self.checksum, number_of_tables = HEADER.unpack_from(buffer, 0)
+        tables = []
+        for i in range(number_of_tables):
+            offset, _ = TABLE_ENTRY.unpack_from(buffer, HEADER.size + i * TABLE_ENTRY.size)
+            tables.append(StringTable(buffer, offset))
+        self.pron_dict = BundleDict(tables[PRON_DICT_KEYS], tables[PRON_DICT_VALUES])
+        self.abbreviations = BundleSet(tables[ABBREVIATIONS])
+        self.nonending_abbreviations = BundleSet(tables[NONENDING_ABBREVIATIONS])
+
+
+def load_bundle(filename: str, resource_files: list):
+    """
+    Memory-map the bundle in 'filename'. Return None if the file does not exist, is not a resource bundle or
+    was built from other versions of the files in 'resource_files'. The contents of the resource files are only
+    read if their stamp differs from the stamp in the bundle, see module documentation.
+    """
+    if sys.byteorder != 'little':
+        # the offset arrays are read with the native byte order
+        return None
+    try:
+        with open(filename, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(buffer) < HEADER.size:
+        return None
+    magic, stamp, checksum, number_of_tables = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or number_of_tables != NUMBER_OF_TABLES or not is_up_to_date(stamp, checksum, resource_files):
+        buffer.close()
+        return None
+    return ResourceBundle(buffer)
+
+
+def is_up_to_date(stamp: bytes, checksum: bytes, resource_files: list) -> bool:
+    """True if 'resource_files' match 'stamp' or, if the files have been touched, still match 'checksum'."""
+    try:
+        return stamp == files_stamp(resource_files) or checksum == files_checksum(resource_files)
+    except OSError:
+        return False
+
+
+def encode_table(strings: list) -> bytes:
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    return struct.pack(f'<{len(offsets) + 1}I', len(encoded), *offsets) + b''.join(encoded)
+
+
+def write_bundle(filename: str, stamp: bytes, checksum: bytes, pron_dict: dict, abbreviations: set,
+                 nonending_abbreviations: set):
+    """Write the resources to 'filename' in the bundle format, with the stamp and checksum of the resource files
+    they were read from."""
+    # sort by the encoded strings, the order used for lookups
+    keys = sorted(pron_dict, key=lambda k: k.encode('utf-8'))
+    tables = [
+        encode_table(keys),
+        encode_table([pron_dict[k] for k in keys]),
+        encode_table(sorted(abbreviations, key=lambda k: k.encode('utf-8'))),
+        encode_table(sorted(nonending_abbreviations, key=lambda k: k.encode('utf-8')))
+    ]
+    header = HEADER.pack(MAGIC, stamp, checksum, len(tables))
+    offset = HEADER.size + TABLE_ENTRY.size * len(tables)
+    table_entries = b''
+    for table in tables:
+        # align tables to 4 bytes for the offset arrays
+        table_entries += TABLE_ENTRY.pack(offset, len(table))
+        offset += len(table) + (-len(table) % 4)
+    with open(filename, 'wb') as f:
+        f.write(header + table_entries)
+        for table in tables:
+            f.write(table + b'\x00' * (-len(table) % 4))
+
+
+def main():
+    from .settings import ManagerResources, BUNDLE_FILE, RESOURCE_FILES
+    resources = ManagerResources(use_bundle=False)
+    write_bundle(BUNDLE_FILE, files_stamp(RESOURCE_FILES), files_checksum(RESOURCE_FILES), resources.pron_dict,
+                 resources.abbreviations, resources.nonending_abbreviations)
+    print(f'Resource bundle written to {BUNDLE_FILE}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+A local HTTP/JSON service keeping a warm Manager in memory, started with:
+
+    process serve [--host 127.0.0.1] [--port 8010] [--unix-socket PATH] [--workers 4] [--max-request-size BYTES]
+                  [--max-batch-size 0] [--max-wait 0.005] [--request-timeout 60]
+
+Endpoints:
+
+    POST /clean, /normalize, /phrase, /transcribe
+        request:  {"text": "Sunnan 4 m/s", "html": false, "options": {"syllab_symbol": ".", "cmu": false}}
+        response: {"text": <string representation of the result>, "tokens": [<token>, ...]}
+        'html' and 'options' are optional, options are the fields of ProcessingOptions and only used by
+        /transcribe.
+    GET /health
+        response: {"status": "ok", "workers": 4, "busy": 1}
+
+Requests are handled in threads, at most 'workers' requests are processed at the same time, further requests
+wait for a free worker. Requests larger than 'max_request_size' bytes are rejected with status 413.
+
+With --max-batch-size > 0 the requests are instead collected into batches by a BatchScheduler, see
+batch_scheduler.py, and /health reports the batch statistics. A batched request not processed within
+'request_timeout' seconds is answered with status 503.
+"""
+import argparse
+import json
+import logging
+import os
+import socketserver
+import threading
+from concurrent.futures import TimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .batch_scheduler import BatchScheduler, DEFAULT_MAX_WAIT
+from .options import ProcessingOptions
+from .textprocessing_manager import Manager
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8010
+DEFAULT_WORKERS = 4
+# maximum size of a request body in bytes
+MAX_REQUEST_SIZE = 1024 * 1024
+# seconds a request waits for its batch to be processed
+REQUEST_TIMEOUT = 60.0
+
+
+class ProcessingService:
+    """Runs the requests of the service on a shared Manager, at most 'workers' at a time, or in batches if a
+    BatchScheduler is given."""
+
+    def __init__(self, manager: Manager, workers: int=DEFAULT_WORKERS, max_request_size: int=MAX_REQUEST_SIZE,
+                 scheduler: BatchScheduler=None, request_timeout: float=REQUEST_TIMEOUT):
+        self.manager = manager
+        self.scheduler = scheduler
+        self.request_timeout = request_timeout
+        self.workers = workers
+        self.max_request_size = max_request_size
+        self.worker_slots = threading.BoundedSemaphore(workers)
+        self.busy = 0
+        self.busy_lock = threading.Lock()
+
+    def health(self) -> dict:
+        with self.busy_lock:
+            health = {'status': 'ok', 'workers': self.workers, 'busy': self.busy}
+        if self.scheduler is not None:
+            health['batching'] = self.scheduler.stats()
+        return health
+
+    def process(self, stage: str, request: dict) -> dict:
+        """Process 'request' with the 'stage' endpoint, raise ValueError for an invalid request and TimeoutError
+        if a batched request is not processed within 'request_timeout' seconds."""
+        text = request.get('text')
+        if not isinstance(text, str):
+            raise ValueError("'text' is missing or not a string")
+        html = request.get('html', False)
+        if not isinstance(html, bool):
+            raise ValueError(f"'html' has to be of type bool, got {html!r}")
+        options = self.parse_options(request.get('options') or {})
+        if self.scheduler is not None:
+            future = self.scheduler.submit(stage, text, html, options)
+            try:
+                tokens = future.result(self.request_timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
+            return self.response(stage, tokens)
+        with self.worker_slots:
+            with self.busy_lock:
+                self.busy += 1
+            try:
+                return self.run_stage(stage, text, html, options)
+            finally:
+                with self.busy_lock:
+                    self.busy -= 1
+
+    def parse_options(self, options: dict) -> ProcessingOptions:
+        if not isinstance(options, dict):
+            raise ValueError("'options' is not an object")
+        unknown = set(options).difference(ProcessingOptions._fields)
+        if unknown:
+            raise ValueError(f'unknown option(s): {sorted(unknown)}, valid options are: {ProcessingOptions._fields}')
+        defaults = ProcessingOptions()
+        for name, value in options.items():
+            # the defaults have the type of each option, str or bool
+            expected = type(getattr(defaults, name))
+            if type(value) is not expected:
+                raise ValueError(f"option '{name}' has to be of type {expected.__name__}, got {value!r}")
+        return self.manager.options._replace(**options)
+
+    def run_stage(self, stage: str, text: str, html: bool, options: ProcessingOptions) -> dict:
+        manager = self.manager
+        if stage == 'clean':
+            tokens = manager.clean(text, html=html)
+        elif stage == 'normalize':
+            tokens = manager.normalize(text, html=html)
+        elif stage == 'phrase':
+            tokens = manager.phrase(text, html=html)
+        else:
+            tokens = manager.transcribe(text, html=html, options=options)
+        return self.response(stage, tokens)
+
+    def response(self, stage: str, tokens: list) -> dict:
+        manager = self.manager
+        if stage == 'clean':
+            string_repr = manager.get_string_representation_clean(tokens)
+        elif stage == 'normalize':
+            string_repr = manager.get_string_representation_normalized(tokens)
+        elif stage == 'phrase':
+            string_repr = manager.get_string_representation_normalized(tokens, ignore_tags=False)
+        else:
+            string_repr = manager.get_string_representation_transcribed(tokens, ignore_tags=False)
+        return {'text': string_repr, 'tokens': tokens}
+
+
+class ProcessingRequestHandler(BaseHTTPRequestHandler):
+
+    stages = ('clean', 'normalize', 'phrase', 'transcribe')
+
+    def address_string(self):
+        # clients of a unix socket have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self.send_json(HTTPStatus.OK, self.server.service.health())
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f'unknown endpoint {self.path}'})
+
+    def do_POST(self):
+        stage = self.path.strip('/')
+        if stage not in self.stages:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f'unknown endpoint {self.path}'})
+            return
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self.send_json(HTTPStatus.LENGTH_REQUIRED, {'error': 'Content-Length required'})
+            return
+        if int(length) > self.server.service.max_request_size:
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                           {'error': f'request larger than {self.server.service.max_request_size} bytes'})
+            self.close_connection = True
+            return
+        try:
+            request = json.loads(self.rfile.read(int(length)).decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('request is not a JSON object')
+            response = self.server.service.process(stage, request)
+        except ValueError as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            return
+        except TimeoutError:
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE,
+                           {'error': f'request not processed within {self.server.service.request_timeout} seconds'})
+            return
+        except Exception as e:
+            logging.exception(f'error processing request to {self.path}')
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+            return
+        self.send_json(HTTPStatus.OK, response)
+
+    def send_json(self, status: HTTPStatus, content: dict):
+        body = json.dumps(content, ensure_ascii=False, default=lambda o: o.__dict__).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, service: ProcessingService):
+        super().__init__(address, ProcessingRequestHandler)
+        self.service = service
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: ProcessingService):
+        super().__init__(path, ProcessingRequestHandler)
+        self.service = service
+
+
+def create_server(service: ProcessingService, host: str=DEFAULT_HOST, port: int=DEFAULT_PORT,
+                  unix_socket: str=None):
+    """Create a server for 'service' listening on host:port, or on the unix socket 'unix_socket' if given."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, service)
+    return ThreadingHTTPServer((host, port), service)
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(prog='process serve', description='local HTTP/JSON service for the tts '
+                                                                       'frontend-pipeline')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--unix-socket', help='listen on this unix socket instead of host and port')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='maximum number of requests processed at the same time')
+    parser.add_argument('--max-request-size', type=int, default=MAX_REQUEST_SIZE,
+                        help='maximum size of a request in bytes')
+    parser.add_argument('--max-batch-size', type=int, default=0,
+                        help='collect concurrent requests into batches of at most this size, 0 disables batching')
+    parser.add_argument('--max-wait', type=float, default=DEFAULT_MAX_WAIT,
+                        help='maximum time in seconds a request waits for a batch to fill up')
+    parser.add_argument('--request-timeout', type=float, default=REQUEST_TIMEOUT,
+                        help='seconds a batched request waits for its result before failing with status 503')
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help='load the pipeline components on the first request instead of at start')
+    return parser.parse_args(argv)
+
+
+def main(argv: list):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    manager = Manager()
+    if not args.no_warm_up:
+        manager.warm_up()
+    scheduler = BatchScheduler(manager, args.max_batch_size, args.max_wait) if args.max_batch_size > 0 else None
+    service = ProcessingService(manager, workers=args.workers, max_request_size=args.max_request_size,
+                                scheduler=scheduler, request_timeout=args.request_timeout)
+    server = create_server(service, args.host, args.port, args.unix_socket)
+    logging.info(f'serving on {args.unix_socket or f"{args.host}:{args.port}"}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if scheduler is not None:
+            scheduler.close()
+        manager.close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
@@ -18,6 +18,7 @@
 import os
 import logging
 from .unicode_maps import replacement_dictionary, post_dict_lookup
+from .resource_bundle import load_bundle
 
 # Set package path
 package_path = os.path.dirname(os.path.abspath(__file__))
@@ -36,6 +37,9 @@ ABBR_NONENDING_FILE = os.path.join(package_path, 'resources/abbreviations_nonend
 # The pronunciation dictionary used in the pipeline at each step to check for valid tokens.
 # This is version 22.01, available here: http://hdl.handle.net/20.500.12537/181
 PRON_DICT_FILE = os.path.join(package_path, 'resources/ice_pron_dict_standard_clear.csv')
+RESOURCE_FILES = [DMII_ABBR_FILE, ABBR_FILE, ABBR_NONENDING_FILE, PRON_DICT_FILE]
+# A precompiled version of the resource files above, built with 'python -m manager.resource_bundle'
+BUNDLE_FILE = os.path.join(package_path, 'resources/manager_resources.bundle')
 
 ##########################
 
@@ -89,10 +93,17 @@ class ManagerResources:
         Lists of abbreviations and a pronunciation dictionary.
     """
 
-    def __init__(self):
-        self.abbreviations = self.read_lines([DMII_ABBR_FILE, ABBR_FILE])
-        self.nonending_abbreviations = self.read_lines([ABBR_NONENDING_FILE])
-        self.pron_dict = self.read_dict(PRON_DICT_FILE)
+    def __init__(self, use_bundle=True):
+        # use the memory-mapped resource bundle if it is up to date with the resource files
+        bundle = load_bundle(BUNDLE_FILE, RESOURCE_FILES) if use_bundle else None
+        if bundle:
+            self.abbreviations = bundle.abbreviations
+            self.nonending_abbreviations = bundle.nonending_abbreviations
+            self.pron_dict = bundle.pron_dict
+        else:
+            self.abbreviations = self.read_lines([DMII_ABBR_FILE, ABBR_FILE])
+            self.nonending_abbreviations = self.read_lines([ABBR_NONENDING_FILE])
+            self.pron_dict = self.read_dict(PRON_DICT_FILE)
 
     @staticmethod
     def read_lines(file_list: list) -> set:
@@ -0,0 +1,86 @@
+"""
+Resources shared by all Manager instances of a process: the pronunciation dictionary and abbreviation lists, the
+cleaner lexicon built from them, and the g2p models. These are read-only after loading and take most of the
+memory and start-up time of a Manager, so they are loaded once, on first use, and referenced by each instance.
+Configuration that differs between instances, e.g. a custom pronunciation dictionary, is kept per instance, see
+G2PManager for how the g2p models are shared.
+"""
+import itertools
+import threading
+from collections.abc import Collection
+
+from .settings import ManagerResources
+
+_shared_resources = None
+_shared_resources_lock = threading.Lock()
+
+
+class CleanerLexicon(Collection):
+    """The words the cleaner preserves: the words of the pronunciation dictionary and the abbreviations. A view on
+    the resources, iterating them on demand, so the words of a memory-mapped resource bundle are not copied into
+    the memory of each process."""
+
+    def __init__(self, resources: ManagerResources):
+        self.parts = (resources.pron_dict, resources.abbreviations, resources.nonending_abbreviations)
+
+    def __contains__(self, word):
+        return any(word in part for part in self.parts)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.parts)
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts)
+
+
+class SharedResources:
+    """Loads each resource on first access and keeps it for the lifetime of the object. Do not modify the
+    returned resources, they are shared between all users of this object."""
+
+    def __init__(self):
+        self.loaded = {}
+        self.lock = threading.RLock()
+
+    def get(self, name: str, load):
+        """Return the resource 'name', calling 'load' to load it if this is the first use."""
+        resource = self.loaded.get(name)
+        if resource is None:
+            with self.lock:
+                resource = self.loaded.get(name)
+                if resource is None:
+                    resource = load()
+                    self.loaded[name] = resource
+        return resource
+
+    @property
+    def resources(self) -> ManagerResources:
+        return self.get('resources', ManagerResources)
+
+    @property
+    def cleaner_lexicon(self) -> CleanerLexicon:
+        """All words of the pronunciation dictionary and the abbreviations, the cleaner preserves these."""
+        return self.get('cleaner_lexicon', self.load_cleaner_lexicon)
+
+    @property
+    def transcriber(self):
+        """The g2p transcriber, with the pronunciation dictionary of the resources as core dictionary."""
+        return self.get('transcriber', self.load_transcriber)
+
+    def load_cleaner_lexicon(self) -> CleanerLexicon:
+        return CleanerLexicon(self.resources)
+
+    def load_transcriber(self):
+        # ice_g2p loads torch and fairseq, only import it when the g2p models are needed
+        from ice_g2p.transcriber import Transcriber, G2P_METHOD
+        transcriber = Transcriber(G2P_METHOD.FAIRSEQ, lang_detect=True, use_dict=True)
+        transcriber.override_core_dict(self.resources.pron_dict)
+        return transcriber
+
+
+def get_shared_resources() -> SharedResources:
+    """Return the SharedResources object of this process, used by default by all Manager instances."""
+    global _shared_resources
+    with _shared_resources_lock:
+        if _shared_resources is None:
+            _shared_resources = SharedResources()
+        return _shared_resources
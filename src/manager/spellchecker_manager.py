@@ -1,4 +1,3 @@
-from reynir_correct.tools import tts_frontend
 from .tokens import Token, TagToken
 from .tokens_manager import extract_sentences_by_normalized
 from .settings import SENTENCE_TAG
@@ -9,10 +8,13 @@ class SpellCheckerManager:
     Replaces normalized text with spell corrected, if applicable.
     """
     def spellcheck(self, text):
+        # GreynirCorrect is slow to import, only import it when spellchecking
+        from reynir_correct.tools import tts_frontend
         checked = tts_frontend.tts_spellcheck(text)
         print(checked)
 
     def spellcheck_token_list(self, tokens: list) -> list:
+        from reynir_correct.tools import tts_frontend
         sentences = extract_sentences_by_normalized(tokens)
         checked_sentences = []
         for sent in sentences:
@@ -14,9 +14,17 @@
 
 """
 import argparse
+import copy
+import multiprocessing.pool
+import re
+import sys
+import threading
 
 from .unicode_maps import replacement_dictionary, post_dict_lookup
 from .settings import ManagerResources
+from .shared_resources import CleanerLexicon, SharedResources, get_shared_resources
+from .options import ProcessingOptions
+from .cache import LRUCache, CacheInfo
 from .settings import (
     HTML_CLOSING_TAG_REPL,
     PUNCTUATION,
@@ -30,21 +38,266 @@ from .spellchecker_manager import SpellCheckerManager
 from .phrasing_manager import PhrasingManager
 from .g2p_manager import G2PManager
 
+# the stages of the pipeline, in processing order
+CLEAN = 'clean'
+NORMALIZE = 'normalize'
+PHRASE = 'phrase'
+TRANSCRIBE = 'transcribe'
+STAGES = (CLEAN, NORMALIZE, PHRASE, TRANSCRIBE)
+# number of tokens in a group of sentences processed by one job in transcribe_parallel()
+PARALLEL_GROUP_SIZE = 2000
+# characters other than letters, digits and whitespace, only these can end a sentence, see SentenceSplitter
+BOUNDARY_CANDIDATE = re.compile('[^\\w\\s]')
+
+# the Manager of a worker process of the process pool, see Manager.transcribe_parallel()
+_pool_manager = None
+
+
+def _init_pool_worker(custom_pron_dict: dict, g2p_cache_file: str):
+    global _pool_manager
+    _pool_manager = Manager(custom_pron_dict)
+    _pool_manager.set_g2p_persistent_cache(g2p_cache_file)
+
+
+def _process_sentence_group(args: tuple) -> list:
+    tokenized, options = args
+    return _pool_manager.process_tokenized(tokenized, options=options)
+
+
+class ProcessingResult:
+    """Holds the token lists from each stage of a single pass through the pipeline. Stages that were not run
+    are None. Note that the token lists share the same Token objects, each stage enriches the tokens of the
+    previous stage, i.e. a token in 'clean' will also contain its normalized version after the normalize stage.
+    Phrasing copies the tokens it changes, so the normalized token list keeps its punctuation."""
+
+    def __init__(self):
+        self.clean = None
+        self.normalized = None
+        self.phrased = None
+        self.transcribed = None
+
+
+class ProcessedSentence:
+    """A transcribed sentence as yielded by Manager.stream(): the sentence tokens, including TagTokens, and the
+    span of the sentence in the input text, from and including start to and excluding end."""
+
+    def __init__(self, tokens: list, start: int, end: int):
+        self.tokens = tokens
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"ProcessedSentence({self.start}, {self.end}, {self.tokens})"
+
+    @classmethod
+    def from_tokenized(cls, tokenized: list, processed: list):
+        """Create a ProcessedSentence holding 'processed', with the span of the tokenized sentence 'tokenized'."""
+        spans = [tok for tok in tokenized if not isinstance(tok, TagToken) and tok.start >= 0]
+        if spans:
+            return cls(processed, spans[0].start, spans[-1].end)
+        return cls(processed, -1, -1)
+
+
+class SentenceSplitter:
+    """Collects text chunks and splits them into tokenized sentences, see Manager.stream(). feed() returns the
+    sentences completed by a chunk, finish() the remaining sentences at the end of the input. Html input can not
+    be split and is only processed by finish(). The buffer only holds the text after the last finished sentence,
+    and is only cleaned and tokenized again if a chunk adds a character that could end a sentence."""
+
+    def __init__(self, manager, html=False):
+        self.manager = manager
+        self.html = html
+        self.html_chunks = []
+        self.buffer = ''
+        # the buffer before this position has been checked for sentence boundaries, see split()
+        self.checked = 0
+        self.token_offset = 0
+        self.char_offset = 0
+
+    def feed(self, chunk: str) -> list:
+        if self.html:
+            self.html_chunks.append(chunk)
+            return []
+        return self.split(chunk)
+
+    def finish(self) -> list:
+        sentences = self.split(''.join(self.html_chunks)) if self.html else []
+        if self.buffer.strip():
+            for sent in self.manager.split_into_sentences(self.buffer, self.html):
+                if not sent:
+                    continue
+                shift_indices(sent, self.token_offset, self.char_offset)
+                sentences.append(sent)
+        self.buffer = ''
+        return sentences
+
+    def append(self, chunk: str):
+        """Append 'chunk' to the buffer. Spans count whitespace sequences as a single space, keep a trailing space
+        as a word boundary."""
+        words = ' '.join(chunk.split())
+        if self.buffer and not self.buffer.endswith(' ') and chunk[:1].isspace():
+            self.buffer += ' '
+        self.buffer += words
+        if words and chunk[-1:].isspace():
+            self.buffer += ' '
+
+    def split(self, chunk: str) -> list:
+        self.append(chunk)
+        # only punctuation and other symbols can end a sentence. If there are none in the part of the buffer not
+        # checked yet, the buffer still holds one unfinished sentence and is not cleaned and tokenized again
+        if not BOUNDARY_CANDIDATE.search(self.buffer, self.checked):
+            self.checked = len(self.buffer)
+            return []
+        sentences = self.manager.split_into_sentences(self.buffer, self.html)
+        if len(sentences) < 2:
+            # a boundary depends on the tokens next to it, the last two tokens are checked again on the next call
+            last_token = self.buffer.rfind(' ', 0, len(self.buffer.rstrip()))
+            self.checked = max(self.buffer.rfind(' ', 0, last_token), 0) if last_token > 0 else 0
+            return []
+        # the last sentence might continue in the next chunk, keep it in the buffer. The sentence boundary before
+        # it depends on its first token, so it is only final if that token is complete, i.e. followed by
+        # whitespace. Otherwise keep the sentence before it in the buffer as well
+        while len(sentences) >= 2:
+            remainder = next((tok for tok in sentences[-1] if not isinstance(tok, TagToken)), None)
+            if remainder is not None and remainder.start >= 0 and ' ' in self.buffer[remainder.start:]:
+                break
+            sentences = sentences[:-1]
+        if len(sentences) < 2:
+            return []
+        for sent in sentences[:-1]:
+            shift_indices(sent, self.token_offset, self.char_offset)
+        self.buffer = self.buffer[remainder.start:]
+        self.checked = 0
+        self.token_offset += remainder.token_index
+        self.char_offset += remainder.start
+        return sentences[:-1]
+
 
 class Manager:
+    """
+    The pipeline components are created on first use, so that e.g. a service only normalizing text never
+    loads the g2p model or the spellchecker. Call warm_up() to create components up front instead.
+    Resources and g2p models are loaded once per process and shared by all Manager instances, see
+    shared_resources. Settings like the custom pronunciation dictionary only apply to this instance.
+    """
+
+    def __init__(self, custom_pron_dict={}, shared: SharedResources=None, processes: int=None,
+                 sentence_cache_size: int=0):
+        """
+        :param custom_pron_dict: a pronunciation dictionary with priority over the core dictionary
+        :param shared: the resources to use, by default the resources shared by all instances of the process
+        :param processes: the number of worker processes for transcribe_parallel(), defaults to the number of CPUs
+        :param sentence_cache_size: number of transcribed sentences to keep in memory and reuse when the same
+        sentence occurs again, 0 disables the cache. See process_tokenized()
+        """
+        self.shared = shared if shared is not None else get_shared_resources()
+        self.custom_pron_dict = custom_pron_dict
+        self.processes = processes
+        # settings used for calls not providing their own ProcessingOptions, see set_g2p_syllab_symbol() etc.
+        self.options = ProcessingOptions()
+        self.g2p_cache_file = None
+        # created components by name, see get_component()
+        self.components = {}
+        self.components_lock = threading.RLock()
+        # transcribed sentences by sentence_key(), with token indices and spans relative to the sentence start
+        self.sentence_cache = LRUCache(sentence_cache_size)
+
+    def get_component(self, name: str, create):
+        """Return the component 'name', calling 'create' to create it if this is the first use."""
+        component = self.components.get(name)
+        if component is None:
+            with self.components_lock:
+                component = self.components.get(name)
+                if component is None:
+                    component = create()
+                    self.components[name] = component
+        return component
+
+    @property
+    def resources(self) -> ManagerResources:
+        return self.shared.resources
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        return self.get_component('tokenizer', lambda: Tokenizer(self.get_abbreviations(),
+                                                                  self.get_nonending_abbreviations()))
+
+    @property
+    def cleaner(self) -> CleanerManager:
+        return self.get_component('cleaner', lambda: CleanerManager(
+            self.get_replacement_dict(), self.get_post_lookup_dict(), self.get_default_cleaner_lexicon(),
+            self.get_alphabet(), self.get_html_mapping()))
+
+    @property
+    def normalizer(self) -> NormalizerManager:
+        return self.get_component('normalizer', NormalizerManager)
+
+    @property
+    def spellchecker(self) -> SpellCheckerManager:
+        return self.get_component('spellchecker', SpellCheckerManager)
+
+    @property
+    def phrasing(self) -> PhrasingManager:
+        return self.get_component('phrasing', PhrasingManager)
+
+    @property
+    def pool(self) -> multiprocessing.pool.Pool:
+        """The process pool for transcribe_parallel(), each worker process holds its own Manager."""
+        return self.get_component('pool', lambda: multiprocessing.Pool(
+            self.processes, initializer=_init_pool_worker, initargs=(self.custom_pron_dict, self.g2p_cache_file)))
+
+    @property
+    def g2p(self) -> G2PManager:
+        return self.get_component('g2p', self.create_g2p)
+
+    def create_g2p(self) -> G2PManager:
+        # the shared transcriber already uses the pronunciation dictionary of the resources
+        g2p = G2PManager(transcriber=self.shared.transcriber)
+        g2p.set_custom_dict(self.custom_pron_dict)
+        if self.g2p_cache_file:
+            g2p.set_persistent_cache(self.g2p_cache_file)
+        return g2p
+
+    def warm_up(self, stages=STAGES, spellcheck=False):
+        """
+        Create the components needed for 'stages' now instead of on first use, e.g. to keep the loading
+        time of models out of the first request to a service. For the 'phrase' stage, the IceParser is started.
 
-    def __init__(self, custom_pron_dict={}):
-        self.resources = ManagerResources()
-        self.tokenizer = Tokenizer(self.get_abbreviations(), self.get_nonending_abbreviations())
-        cleaner_lexicon = self.get_default_cleaner_lexicon()
-        self.cleaner = CleanerManager(self.get_replacement_dict(), self.get_post_lookup_dict(), cleaner_lexicon,
-                                      self.get_alphabet(), self.get_html_mapping())
-        self.normalizer = NormalizerManager()
-        self.spellchecker = SpellCheckerManager()
-        self.phrasing = PhrasingManager()
-        self.g2p = G2PManager()
-        self.g2p.set_core_pron_dict(self.get_prondict())
-        self.g2p.set_custom_dict(custom_pron_dict)
+        :param stages: the stages to prepare, a collection of 'clean', 'normalize', 'phrase' and 'transcribe'
+        :param spellcheck: if True, also load the spellchecker
+        """
+        unknown = set(stages).difference(STAGES)
+        if unknown:
+            raise ValueError(f'unknown stage(s): {unknown}, valid stages are: {STAGES}')
+
+        self.cleaner
+        if set(stages).difference({CLEAN}):
+            self.tokenizer
+            self.normalizer
+            self.phrasing
+        if PHRASE in stages:
+            self.phrasing.warm_up()
+        if TRANSCRIBE in stages:
+            self.g2p
+        if spellcheck:
+            self.spellchecker
+
+    def close(self):
+        """Release external processes and files held by the pipeline, i.e. the IceParser JVM used for phrasing,
+        the process pool of transcribe_parallel() and the connection to the persistent g2p cache."""
+        if 'phrasing' in self.components:
+            self.phrasing.close()
+        if 'g2p' in self.components:
+            self.g2p.close()
+        self.close_pool()
+
+    def close_pool(self):
+        """Stop the worker processes of transcribe_parallel(), they are started again on the next call."""
+        with self.components_lock:
+            pool = self.components.pop('pool', None)
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     def get_abbreviations(self):
         return self.resources.abbreviations
@@ -70,23 +323,43 @@ class Manager:
     def get_html_mapping(self):
         return HTML_CLOSING_TAG_REPL
 
-    def get_default_cleaner_lexicon(self) -> list:
-        lexicon = list(self.get_prondict().keys())
-        lexicon.extend(self.get_abbreviations())
-        lexicon.extend(self.get_nonending_abbreviations())
-        return lexicon
+    def get_default_cleaner_lexicon(self) -> CleanerLexicon:
+        return self.shared.cleaner_lexicon
 
     def set_g2p_custom_dict(self, pron_dict: dict):
-        self.g2p.set_custom_dict(pron_dict)
+        with self.components_lock:
+            self.custom_pron_dict = pron_dict
+            if 'g2p' in self.components:
+                self.g2p.set_custom_dict(pron_dict)
+            self.sentence_cache.invalidate()
+        # the worker processes use the dictionary they were started with
+        self.close_pool()
+
+    def set_g2p_persistent_cache(self, filename: str):
+        """Store transcriptions of out-of-vocabulary words in 'filename', an SQLite database that can be shared
+        between processes. Set to None to stop using the persistent cache."""
+        with self.components_lock:
+            self.g2p_cache_file = filename
+            if 'g2p' in self.components:
+                self.g2p.set_persistent_cache(filename)
+        self.close_pool()
 
     def set_g2p_syllab_symbol(self, syllab_symbol: str):
-        self.g2p.set_syllab_symbol(syllab_symbol)
+        """Set the default syllab symbol, calls providing ProcessingOptions are not affected."""
+        self.options = self.options._replace(syllab_symbol=syllab_symbol)
 
     def set_g2p_stress(self, value: bool):
-        self.g2p.set_stress(value)
+        self.options = self.options._replace(stress=value)
 
     def set_g2p_word_separator(self, word_sep: str):
-        self.g2p.set_word_separator(word_sep)
+        self.options = self.options._replace(word_separator=word_sep)
+
+    def call_options(self, options: ProcessingOptions=None, **settings) -> ProcessingOptions:
+        """Return 'options' if given, else the default options of this manager with 'settings', the keyword
+        arguments of a call."""
+        if options is not None:
+            return options
+        return self.options._replace(**settings)
 
     def clean(self, text: str, html=False) -> list:
         """
@@ -129,7 +402,20 @@ class Manager:
         """
 
         clean = self.clean(text, html)
-        tokenized = self.tokenize_from_list(clean)
+        return self.normalize_tokens(clean)
+
+    def normalize_tokens(self, clean_tokens: list) -> list:
+        """
+        Normalize the tokens in 'clean_tokens', e.g. the result of clean(). Cleaning is not repeated.
+
+        :param clean_tokens: a list of CleanTokens to tokenize and normalize
+        :return: a list of Tokens representing a normalized version of 'clean_tokens' with additional TagTokens
+        representing ssml-tags or pauses. Includes processing history of each token.
+        """
+        return self.normalize_tokenized(self.tokenize_from_list(clean_tokens))
+
+    def normalize_tokenized(self, tokenized: list) -> list:
+        """Normalize the tokens in 'tokenized', the result of tokenize_from_list(), and add pause tags."""
         normalized = self.normalizer.normalize_token_list(tokenized)
         normalized_with_tag_tokens = self.phrasing.add_pause_tags(normalized)
         return normalized_with_tag_tokens
@@ -145,10 +431,20 @@ class Manager:
         ssml-tags or pauses. Includes processing history of each token.
         """
         normalized = self.normalize(text, html=html, split_sent=split_sent)
-        phrased = self.phrasing.phrase_token_list(normalized)
-        return phrased
+        return self.phrase_tokens(normalized)
+
+    def phrase_tokens(self, normalized_tokens: list) -> list:
+        """
+        Adds phrasing marks as pause tags to 'normalized_tokens', e.g. the result of normalize() or
+        normalize_tokens(). The input list is not changed, so it can be phrased again later.
+
+        :param normalized_tokens: a list of normalized Tokens and TagTokens
+        :return: a list of Tokens with additional TagTokens representing pauses
+        """
+        return self.phrasing.phrase_token_list(normalized_tokens)
 
-    def transcribe(self, text: str, html=False, phrasing=True, spellcheck=False, split_sent=True, cmu: bool=False) -> list:
+    def transcribe(self, text: str, html=False, phrasing=True, spellcheck=False, split_sent=True, cmu: bool=False,
+                   options: ProcessingOptions=None) -> list:
         """
         Transcribes 'text' using the SAMPA phonetic alphabet.
 
@@ -158,20 +454,283 @@ class Manager:
         :param spellcheck: if True, perform spellcheck after normalizing
         :param syllab_stress: if True, add syllabification and stress labels to the phonetic transcripts
         :param split_sent: if True, split 'text' into sentences or meaningful phrase chunk for the TTS
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'phrasing', 'spellcheck', 'cmu' and the g2p settings
+        of the manager
         :return: a list of Tokens representing a transcribed version of 'text' with additional TagTokens representing
         ssml-tags or pauses. Includes processing history of each token.
         """
-        if phrasing:
+        options = self.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        if self.sentence_cache.maxsize > 0:
+            clean = self.clean(text, html)
+            if clean:
+                return self.process_tokenized(self.tokenize_from_list(clean), options=options)
+        if options.phrasing:
             normalized = self.phrase(text, html=html, split_sent=split_sent)
         else:
             normalized = self.normalize(text, html=html, split_sent=split_sent)
 
-        if spellcheck:
-            normalized = self.spellchecker.spellcheck_token_list(normalized)
+        return self.transcribe_tokens(normalized, options=options)
+
+    def transcribe_tokens(self, tokens: list, spellcheck=False, cmu: bool=False,
+                          options: ProcessingOptions=None) -> list:
+        """
+        Transcribes the normalized or phrased 'tokens', e.g. the result of phrase_tokens(), without cleaning
+        and normalizing again. Transcribing the same token list again, e.g. after changes in the custom
+        pronunciation dictionary, replaces earlier transcriptions.
+
+        :param tokens: a list of normalized (and phrased) Tokens and TagTokens
+        :param spellcheck: if True, perform spellcheck before transcribing
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'spellcheck', 'cmu' and the g2p settings of the manager
+        :return: a list of Tokens representing a transcribed version of 'tokens' with additional TagTokens
+        representing ssml-tags or pauses. Includes processing history of each token.
+        """
+        options = self.call_options(options, spellcheck=spellcheck, cmu=cmu)
+        if options.spellcheck:
+            tokens = self.spellchecker.spellcheck_token_list(tokens)
 
-        transcribed = self.g2p.transcribe(normalized, cmu=cmu)
+        transcribed = self.g2p.transcribe(tokens, options=options)
         return transcribed
 
+    def process(self, text: str, html=False, stages=STAGES, spellcheck=False, split_sent=True,
+                cmu: bool=False, options: ProcessingOptions=None) -> ProcessingResult:
+        """
+        Run 'text' through the pipeline once, performing each stage only once, and return the results of all
+        stages. The stages needed as an input for the requested stages are always run, i.e. 'clean' and
+        'normalize' for 'transcribe'. Phrasing is only performed if 'phrase' is in 'stages', in which case
+        the transcription is based on the phrased token list.
+
+        :param text: raw text or html-text to process
+        :param html: if True, 'text' will be interpreted as html-string and parsed accordingly
+        :param stages: the stages to run, a collection of 'clean', 'normalize', 'phrase' and 'transcribe'
+        :param spellcheck: if True, perform spellcheck after normalizing (and phrasing), before transcribing
+        :param split_sent: if True, split 'text' into sentences or meaningful phrase chunk for the TTS
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'spellcheck', 'cmu' and the g2p settings of the manager.
+        The 'phrasing' option is not used, phrasing is controlled by 'stages'
+        :return: a ProcessingResult holding the token lists of each stage run
+        """
+        unknown = set(stages).difference(STAGES)
+        if unknown:
+            raise ValueError(f'unknown stage(s): {unknown}, valid stages are: {STAGES}')
+
+        result = ProcessingResult()
+        result.clean = self.clean(text, html)
+        if not set(stages).difference({CLEAN}):
+            return result
+
+        result.normalized = self.normalize_tokens(result.clean)
+        processed = result.normalized
+        if PHRASE in stages:
+            result.phrased = self.phrase_tokens(result.normalized)
+            processed = result.phrased
+
+        if TRANSCRIBE in stages:
+            result.transcribed = self.transcribe_tokens(processed, spellcheck=spellcheck, cmu=cmu, options=options)
+        return result
+
+    def stream(self, text_or_chunks, html=False, phrasing=True, spellcheck=False, cmu: bool=False,
+               options: ProcessingOptions=None):
+        """
+        Process the input sentence by sentence and yield each sentence as soon as it is transcribed. The input can
+        be a string or an iterable of text chunks, e.g. read from a file or a socket. Chunks are collected until
+        they contain a complete sentence, a sentence is only regarded complete when followed by the start of the
+        next one or the end of the input. Html input can not be split and is processed when all chunks are read.
+        Token indices and spans refer to the whole input, where spans count each whitespace sequence as a single
+        space, same as for the other processing methods.
+
+        :param text_or_chunks: raw text or html-text, or an iterable of text chunks
+        :param html: if True, the input will be interpreted as html-string and parsed accordingly
+        :param phrasing: if True, perform phrasing after normalizing (and spellcheck if applied)
+        :param spellcheck: if True, perform spellcheck after normalizing
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'phrasing', 'spellcheck', 'cmu' and the g2p settings
+        of the manager
+        :return: a generator of ProcessedSentence objects, in the order of the input
+        """
+        options = self.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        chunks = [text_or_chunks] if isinstance(text_or_chunks, str) else text_or_chunks
+        splitter = SentenceSplitter(self, html)
+        for chunk in chunks:
+            for sent in splitter.feed(chunk):
+                yield self.process_sentence(sent, options=options)
+        for sent in splitter.finish():
+            yield self.process_sentence(sent, options=options)
+
+    def split_into_sentences(self, text: str, html=False) -> list:
+        """Clean and tokenize 'text', return the tokenized tokens as a list of sentences."""
+        clean = self.clean(text, html)
+        if not clean:
+            return [[]]
+        return split_sentences(self.tokenize_from_list(clean))
+
+    def process_sentence(self, tokenized: list, phrasing=True, spellcheck=False, cmu: bool=False,
+                         options: ProcessingOptions=None) -> ProcessedSentence:
+        """Normalize, phrase and transcribe a tokenized sentence as returned by split_into_sentences()."""
+        transcribed = self.process_tokenized(tokenized, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu,
+                                             options=options)
+        return ProcessedSentence.from_tokenized(tokenized, transcribed)
+
+    def process_tokenized(self, tokenized: list, phrasing=True, spellcheck=False, cmu: bool=False,
+                          options: ProcessingOptions=None) -> list:
+        """Normalize, phrase and transcribe the tokens in 'tokenized', the result of tokenize_from_list() or a
+        part of it consisting of whole sentences. If the sentence cache is enabled, sentences processed before
+        with the same options are taken from the cache, re-indexed to their position in 'tokenized'."""
+        options = self.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        if self.sentence_cache.maxsize <= 0:
+            return self.process_uncached(tokenized, options)
+
+        sentences = split_sentences(tokenized)
+        keys = [self.sentence_key(sent, options) for sent in sentences]
+        cached = {key: self.sentence_cache.get(key) for key in keys}
+        # the first sentence for each key not in the cache, repeated sentences are only processed once
+        missing = {}
+        for i, key in enumerate(keys):
+            if cached[key] is None and key not in missing:
+                missing[key] = i
+        processed = {}
+        if missing:
+            missing_indices = sorted(missing.values())
+            missing_processed = split_sentences(self.process_uncached(
+                [tok for i in missing_indices for tok in sentences[i]], options))
+            if len(missing_processed) != len(missing_indices):
+                # processing changed the sentence splitting, the results can not be assigned to the sentences
+                return self.process_uncached(tokenized, options)
+            for i, sent in zip(missing_indices, missing_processed):
+                processed[i] = sent
+                cached[keys[i]] = copy.deepcopy(sent)
+                token_offset, char_offset = self.sentence_offsets(sentences[i])
+                shift_indices(cached[keys[i]], -token_offset, -char_offset)
+                self.sentence_cache.put(keys[i], cached[keys[i]])
+
+        result = []
+        for i, key in enumerate(keys):
+            sent = processed.get(i)
+            if sent is None:
+                sent = copy.deepcopy(cached[key])
+                shift_indices(sent, *self.sentence_offsets(sentences[i]))
+            result.extend(sent)
+        return result
+
+    def process_uncached(self, tokenized: list, options: ProcessingOptions) -> list:
+        normalized = self.normalize_tokenized(tokenized)
+        if options.phrasing:
+            normalized = self.phrase_tokens(normalized)
+        return self.transcribe_tokens(normalized, options=options)
+
+    @staticmethod
+    def sentence_offsets(sentence: list) -> tuple:
+        """Return the token index and the start of the span of the first token in 'sentence'."""
+        spans = [tok.start for tok in sentence if isinstance(tok, Token) and tok.start >= 0]
+        return sentence[0].token_index, spans[0] if spans else 0
+
+    @classmethod
+    def sentence_key(cls, sentence: list, options: ProcessingOptions) -> tuple:
+        """The key of a tokenized sentence in the sentence cache: the tokens with their indices and spans
+        relative to the sentence start, and the options of the call."""
+        token_offset, char_offset = cls.sentence_offsets(sentence)
+        key = []
+        for tok in sentence:
+            if isinstance(tok, TagToken):
+                key.append((tok.name, tok.token_index - token_offset, tok.ssml_start, tok.ssml_end))
+            else:
+                start = tok.start - char_offset if tok.start >= 0 else -1
+                key.append((tok.name, tok.token_index - token_offset, start, tok.clean, tuple(tok.tokenized)))
+        return tuple(key), options
+
+    def sentence_cache_info(self) -> CacheInfo:
+        """Statistics of the sentence cache, see process_tokenized()."""
+        return self.sentence_cache.cache_info()
+
+    def transcribe_parallel(self, text: str, html=False, phrasing=True, spellcheck=False, cmu: bool=False,
+                            options: ProcessingOptions=None, group_size: int=PARALLEL_GROUP_SIZE) -> list:
+        """
+        Transcribe 'text' like transcribe(), using a pool of worker processes. The text is cleaned and tokenized
+        in this process, then split into groups of whole sentences of about 'group_size' tokens, which are
+        normalized, phrased and transcribed by the worker processes. The results are joined in the order of the
+        input, token indices and spans refer to the whole text. Use for long documents, e.g. book chapters; the
+        worker processes are kept running until close() is called.
+
+        :param text: raw text or html-text to transcribe
+        :param html: if True, 'text' will be interpreted as html-string and parsed accordingly
+        :param phrasing: if True, perform phrasing after normalizing (and spellcheck if applied)
+        :param spellcheck: if True, perform spellcheck after normalizing
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'phrasing', 'spellcheck', 'cmu' and the g2p settings
+        of the manager
+        :param group_size: the number of tokens to send to a worker process in one job
+        :return: a list of Tokens representing a transcribed version of 'text' with additional TagTokens
+        representing ssml-tags or pauses. Includes processing history of each token.
+        """
+        options = self.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        clean = self.clean(text, html)
+        if not clean:
+            return []
+        groups = [[]]
+        for sent in split_sentences(self.tokenize_from_list(clean)):
+            if groups[-1] and len(groups[-1]) + len(sent) > group_size:
+                groups.append([])
+            groups[-1].extend(sent)
+        if len(groups) == 1:
+            return self.process_tokenized(groups[0], options=options)
+
+        processed = self.pool.map(_process_sentence_group, [(group, options) for group in groups], chunksize=1)
+        return [tok for group in processed for tok in group]
+
+    def normalize_batch(self, texts: list, html=False, split_sent=True) -> list:
+        """
+        Normalize each text in 'texts', see normalize(). Sentences occurring in more than one text are only
+        normalized once.
+
+        :param texts: a list of raw texts or html-texts to normalize
+        :param html: if True, the texts will be interpreted as html-strings and parsed accordingly
+        :return: a list of normalized token lists, one for each text in 'texts'
+        """
+        tokenized = [self.tokenize_from_list(self.clean(text, html)) for text in texts]
+        normalized = self.normalizer.normalize_token_lists(tokenized)
+        return [self.phrasing.add_pause_tags(token_list) for token_list in normalized]
+
+    def phrase_batch(self, texts: list, html=False, split_sent=True) -> list:
+        """
+        Normalize and phrase each text in 'texts', see phrase(). All sentences are sent to the phrasing module
+        in one round trip.
+
+        :param texts: a list of raw texts or html-texts to normalize and phrase
+        :param html: if True, the texts will be interpreted as html-strings and parsed accordingly
+        :param split_sent: if True, split the texts into sentences or meaningful phrase chunk for the TTS
+        :return: a list of phrased token lists, one for each text in 'texts'
+        """
+        normalized = self.normalize_batch(texts, html=html, split_sent=split_sent)
+        return self.phrasing.phrase_token_lists(normalized)
+
+    def transcribe_batch(self, texts: list, html=False, phrasing=True, spellcheck=False, split_sent=True,
+                         cmu: bool=False, options: ProcessingOptions=None) -> list:
+        """
+        Transcribe each text in 'texts', see transcribe(). Processing is shared between the texts where
+        possible: all sentences are phrased in one round trip and each distinct word is only transcribed once.
+
+        :param texts: a list of raw texts or html-texts to transcribe
+        :param html: if True, the texts will be interpreted as html-strings and parsed accordingly
+        :param phrasing: if True, perform phrasing after normalizing (and spellcheck if applied)
+        :param spellcheck: if True, perform spellcheck after normalizing
+        :param split_sent: if True, split the texts into sentences or meaningful phrase chunk for the TTS
+        :param cmu: if True, return transcriptions in the CMU format
+        :param options: settings for this call, replacing 'phrasing', 'spellcheck', 'cmu' and the g2p settings
+        of the manager
+        :return: a list of transcribed token lists, one for each text in 'texts'
+        """
+        options = self.call_options(options, phrasing=phrasing, spellcheck=spellcheck, cmu=cmu)
+        if options.phrasing:
+            normalized = self.phrase_batch(texts, html=html, split_sent=split_sent)
+        else:
+            normalized = self.normalize_batch(texts, html=html, split_sent=split_sent)
+
+        if options.spellcheck:
+            normalized = [self.spellchecker.spellcheck_token_list(token_list) for token_list in normalized]
+
+        return self.g2p.transcribe_batch(normalized, options=options)
+
     #######################################################################################################
     #
     #           METHODS FOR DIFFERENT STRING REPRESENTATIONS OF A PROCESSED TEXT
@@ -287,6 +846,15 @@ def parse_args():
 
 
 def main():
+    if sys.argv[1:2] == ['serve']:
+        from .server import main as serve
+        serve(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['bulk']:
+        from .bulk import main as bulk
+        bulk(sys.argv[2:])
+        return
+
     args = parse_args()
     if not args.input_text:
         print('please provide string to process!')
@@ -294,20 +862,16 @@ def main():
 
     input_text = args.input_text
     manager = Manager()
-    clean_input = manager.clean(input_text)
+    manager.set_g2p_syllab_symbol('.')
+    processed = manager.process(input_text)
     print('==========CLEAN=============')
-    print(manager.get_string_representation_clean(clean_input))
-    normalized_input = manager.normalize(input_text)
+    print(manager.get_string_representation_clean(processed.clean))
     print('==========NORMALIZED=============')
-    print(manager.get_string_representation_normalized(normalized_input))
-    phrased = manager.phrase(input_text)
+    print(manager.get_string_representation_normalized(processed.normalized))
     print('==========PHRASED=============')
-    print(manager.get_string_representation_normalized(phrased, False))
-    manager.set_g2p_syllab_symbol('.')
-    transcribed = manager.transcribe(input_text, phrasing=False)
+    print(manager.get_string_representation_normalized(processed.phrased, False))
     print('==========TRANSCRIBED=============')
-    print(manager.get_string_representation_transcribed(transcribed, False))
-
+    print(manager.get_string_representation_transcribed(processed.transcribed, False))
 
 if __name__ == '__main__':
     main()
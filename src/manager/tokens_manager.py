@@ -211,6 +211,40 @@ def extract_sentences_by_transcribed(token_list: list, ignore_tags=True, word_se
     return sentences
 
 
+def split_sentences(token_list: list) -> list:
+    """Split token_list into a list of token lists, one for each sentence. Each sentence keeps its tag tokens,
+    including the sentence tag at its end. A sentence tag inside an SSML-lang element does not split the list,
+    so that start and end tag of the element always are in the same sentence."""
+    sentences = []
+    sent_tokens = []
+    in_ssml = False
+    for elem in token_list:
+        sent_tokens.append(elem)
+        if not isinstance(elem, TagToken):
+            continue
+        if elem.ssml_start:
+            in_ssml = True
+        elif elem.ssml_end:
+            in_ssml = False
+        elif elem.name == SENTENCE_TAG and not in_ssml:
+            sentences.append(sent_tokens)
+            sent_tokens = []
+
+    if sent_tokens:
+        sentences.append(sent_tokens)
+
+    return sentences
+
+
+def shift_indices(token_list: list, token_offset: int, char_offset: int) -> None:
+    """Add token_offset to the token index of each token in token_list and char_offset to the spans of
+    Tokens having a span. Used when a token list represents a part of a larger text."""
+    for elem in token_list:
+        elem.token_index += token_offset
+        if isinstance(elem, Token) and elem.start >= 0:
+            elem.set_span(elem.start + char_offset, elem.end + char_offset)
+
+
 def extract_tokens_and_tag(token: Token) -> list:
     # if token.name contains space(s), extract each token with the pos
     # e.g. name: 'fimm fimm sjö' pos: 'ta'
@@ -6,6 +6,56 @@ UPPER_CASE = '[A-ZÁÉÍÓÚÝÐÞÆÖ]'
 # we can't use \\w because it only takes ascii chars into account
 WORD_CHAR = '[A-Za-záéíóúýðþæöÁÉÍÓÚÝÐÞÆÖ\\d.µ]'
 EOS_SYMBOL = '[.:?!;)(]'
+# possibly a year at the end of a sentence, we only consider 4 digit years up to year 2099
+YEAR = '(1\\d{3})|(20\\d{2})\\.'
+
+# precompiled patterns of the tokenizer rules, see should_process() and process_special_characters()
+ALPHABETIC_TOKEN = re.compile(ALPHABETIC)
+# a sentence has to contain at least one alphabetic character or digit, see finish_sentence()
+ALPHANUMERIC_CHAR = re.compile(ALPHABETIC + '|\\d')
+# a dot directly following the last token of a sentence, see ensure_full_stop()
+FINAL_DOT = re.compile('[^\\s]\\.$')
+YEAR_TOKEN = re.compile(YEAR)
+UPPERCASE_ABBR = re.compile('(' + UPPER_CASE + '\\.)+')
+# tokens matching one of these patterns as a whole are not split
+NO_SPLIT_TOKEN = re.compile('|'.join('(?:' + pattern + ')' for pattern in [
+    # a simple cardinal or ordinal number
+    '\\d+\\.?',
+    # a more complex combination of digits and punctuations, e.g. dates and large numbers
+    '(\\d+[.,:]\\d+)+[,.]?',
+    # telephone number or 'kennitala', don't split on hyphen
+    '\\d{3}-\\d{4}[,.?:]?',
+    '\\d{6}-\\d{4}[,.?:]?',
+    # don't split on hyphen if we have a digits pattern with more than one hyphen
+    '(\\d+-){2,}\\d+',
+    # don't split on hyphen for non-digits
+    '[^\\d]+-[^\\d]+',
+    # don't split on slash for small number of chars on each side (digits or letters)
+    WORD_CHAR + '{1,3}/' + WORD_CHAR + '{1,3}',
+    # don't split smileys TODO: add more patterns here
+    '(:\\))|(:\\()',
+]))
+# special cases - resolve! We need to have simple rules for when to split and when not, the tokenizer
+# should not have to know too much about the normalizer! Matched against the start of the lower case token
+NO_SPLIT_UNIT = re.compile('(millj./)|(.+/klst)|(.+/kwst)|(.+/gwst)|(.+/gw\\.st)|(.+/mwst)|(.+/twst)|(.+/m²)|(.+/m³)'
+                           '|(.+/mm²)|(.+/mm³)|(.+/cm²)|(.+/cm³)|(.+/ferm)')
+# don't do anything with tokens that look like links and e-mail addresses, or with closing tags tokens.
+# Matched against the start of the token
+NO_SPLIT_PREFIX = re.compile('(www)|(http)|@|(</.+>)')
+
+# the replacements of process_special_characters(), in the order they are applied
+# insert spaces after and before enclosing parenthesis
+ENCLOSING_PARENTHESIS = re.compile('(\\()(.+)(\\))')
+# insert space after these symbols: '(', '[', '{', '-', '_'
+INSERT_SPACE_AFTER_ANYWHERE = re.compile('([(\\[{\\-/_+])')
+# insert space before these symbols: ')', '[', '}' '-', '_'  TODO: shouldn't '[' be ']' ?
+INSERT_SPACE_BEFORE_ANYWHERE = re.compile('([)\\]}\\-/_%+])')
+# insert space after these symbols at the beginning of a token: '"',
+INSERT_SPACE_AFTER_IF_BEGINNING = re.compile('^(\")(.+)')
+# insert space before these symbols at the end of a token: '"', ':', ',', '.', '!', '?'
+INSERT_SPACE_BEFORE_IF_END = re.compile('(.+)([\":,.!?])$')
+# insert space before these symbols if two of them occur at the end of a token
+INSERT_SPACE_BEFORE_IF_END_AND_PUNCT = re.compile('(.+)([\":,.!?])(\\s[\":,.!?])$')
 
 
 class Tokenizer:
@@ -13,8 +63,6 @@ class Tokenizer:
     def __init__(self, abbreviations: set, nonending_abbr: set):
         self.abbreviations = abbreviations
         self.abbreviations_non_ending = nonending_abbr
-        # if True, prevents a space once set to be deleted at later processing stages, in append_token()
-        self.freeze_space = False
 
     @staticmethod
     def read_list(filename: str) -> list:
@@ -30,26 +78,30 @@ class Tokenizer:
             abbreviation.
         """
         sentences = []
-        tokens = text.split()
-        tmp_str = ''
+        # the tokens of the current sentence, each followed by a space. Joined only when the sentence is
+        # finished, so the time needed stays linear in the length of the text, even for very long sentences
+        current = []
         last_token = ''
+        # if True, prevents a space once set to be deleted at later processing stages, in append_token().
+        # Kept local, so that one Tokenizer can be used from several threads at once
+        freeze_space = False
         # loop through all tokens in text and determine sentence boundaries, store tokens ending with '.' in the
         # last_token variable
-        for token in tokens:
-            if not token:
-                continue
+        for token in text.split():
             tokenized = token
-            if not re.fullmatch(ALPHABETIC, token):
-                tokenized = self.process_special_characters(token.strip())
-            tmp_str = self.check_last_token(sentences, tmp_str, last_token, tokenized)
+            if not ALPHABETIC_TOKEN.fullmatch(token):
+                tokenized = self.process_special_characters(token)
+                # the dot of a year at the end of a sentence is detached, keep the space before it
+                freeze_space = freeze_space or self.is_year(token)
+            current = self.check_last_token(sentences, current, last_token, tokenized, freeze_space)
             # keep tokens ending with '.' for the next iteration
             last_token = self.update_last_token(tokenized)
             if last_token:
                 continue
-            tmp_str = self.update_tmp_string(sentences, tmp_str, tokenized)
-            self.freeze_space = False
+            current = self.update_current_sentence(sentences, current, tokenized)
+            freeze_space = False
 
-        self.finish_sentence(sentences, tmp_str, last_token)
+        self.finish_sentence(sentences, ''.join(current), last_token)
         return sentences
 
     def finish_sentence(self, sentences: list, tmp_string: str, last_token: str) -> None:
@@ -67,7 +119,7 @@ class Tokenizer:
         # and return
         if tmp_string:
             last_sentence = tmp_string
-            if not re.match('.*' + ALPHABETIC + '.*|.*\\d+.*', last_sentence):
+            if not ALPHANUMERIC_CHAR.search(last_sentence):
                 # we dont' want to add a sentence only constisting of symbols, do we?
                 # rather add to last sentence, was probably a mistake to finish that one
                 if sentences:
@@ -80,35 +132,37 @@ class Tokenizer:
             else:
                 sentences.append(tmp_string.strip())
 
-    def update_tmp_string(self, sentences: list, tmp_string: str, tokenized: str) -> str:
-        """ Append 'tokenized' to 'tmp_string', check if 'tokenized' represents an end of a sentence,
-        if yes, create a new sentence from tmp_string and add to sentences. Return tmp_string, that
-        might have been reset to an empty string if we had a full sentence."""
-        tmp_string += tokenized + ' '
+    def update_current_sentence(self, sentences: list, current: list, tokenized: str) -> list:
+        """ Append 'tokenized' to the tokens of the current sentence, check if 'tokenized' represents an end of
+        a sentence, if yes, create a new sentence from 'current' and add to sentences. Return the tokens of the
+        current sentence, an empty list if we had a full sentence."""
+        current.append(tokenized + ' ')
         if self.is_EOS(tokenized):
-            sentences.append(tmp_string)
-            tmp_string = ''
-        return tmp_string
+            sentences.append(''.join(current))
+            current = []
+        return current
 
     def update_last_token(self, tokenized: str) -> str:
         if self.ends_with_dot(tokenized):
             return tokenized
         return ''
 
-    def check_last_token(self, sentences: list, tmp_string: str, last_token: str, tokenized: str) -> str:
+    def check_last_token(self, sentences: list, current: list, last_token: str, tokenized: str,
+                         freeze_space=False) -> list:
         if last_token:
             if not self.is_full_stop_EOS(tokenized, last_token):
-                tmp_string = self.append_token(tmp_string, last_token)
+                current.append(self.append_token('', last_token, freeze_space))
             else:
-                sentence = self.ensure_full_stop(tmp_string, last_token)
+                sentence = self.ensure_full_stop(''.join(current), last_token)
                 sentences.append(sentence)
-                tmp_string = ''
-        return tmp_string
+                current = []
+        return current
 
-    def append_token(self, tmp_string: str, token: str) -> str:
+    @staticmethod
+    def append_token(tmp_string: str, token: str, freeze_space=False) -> str:
         """ 'token' might end with ' .', delete the space, because we are dealing with an abbreviation
-        or a digits pattern that should not contain a space before the '.'"""
-        if not self.freeze_space:
+        or a digits pattern that should not contain a space before the '.', unless 'freeze_space' is set"""
+        if not freeze_space:
             token = token.replace(' ', '')
 
         return tmp_string + token + ' '
@@ -121,7 +175,7 @@ class Tokenizer:
         tmp_string += token.strip()
         # at the end of a sentence we detach the final dot from the last token
         # TODO: might not always be feasible?
-        if re.search('[^\\s]\\.$', tmp_string):
+        if FINAL_DOT.search(tmp_string):
             tmp_string = tmp_string[:-1] + ' .'
        # if not tmp_string.endswith(' .') and not tmp_string.endswith(' . \"'):
        #     tmp_string = tmp_string[:-1] + ' .'
@@ -169,31 +223,18 @@ class Tokenizer:
         if not self.should_process(token):
             # we need to insert spaces after and before enclosing parenthesis regardless
             # of the return value of "should process", also if a token ends with a comma, insert space
-            token = re.sub('(\\()(.+)(\\))', '\\g<1> \\g<2> \\g<3>', token)
+            token = ENCLOSING_PARENTHESIS.sub('\\g<1> \\g<2> \\g<3>', token)
             if token.endswith(','):
                 token = token[:-1] + ' ,'
             return token
 
-        # For all kinds of punctuation we need to insert spaces at the correct positions
-        # Patterns:
-        processed_token = token
-        # insert space after these symbols: '(', '[', '{', '-', '_'
-        insert_space_after_anywhere = '([(\\[{\\-/_+])'
-        # insert space before these symbols: ')', '[', '}' '-', '_'  TODO: shouldn't '[' be ']' ?
-        insert_space_before_anywhere = '([)\\]}\\-/_%+])'
-        # insert space after these symbols at the beginning of a token: '"',
-        insert_space_after_if_beginning = '^(\")(.+)'
-        # insert space before these symbols at the end of a token: '"', ':', ',', '.', '!', '?'
-        insert_space_before_if_end = '(.+)([\":,.!?])$'
-        # insert space before these symbols if two of them occur at the end of a token
-        insert_space_before_if_end_and_punct = '(.+)([\":,.!?])(\\s[\":,.!?])$'
-
-        # Replacements
-        processed_token = re.sub(insert_space_after_anywhere, '\\g<1> ', processed_token)
-        processed_token = re.sub(insert_space_before_anywhere, ' \\g<1>', processed_token)
-        processed_token = re.sub(insert_space_after_if_beginning, '\\g<1> \\g<2>', processed_token)
-        processed_token = re.sub(insert_space_before_if_end, '\\g<1> \\g<2>', processed_token)
-        processed_token = re.sub(insert_space_before_if_end_and_punct, '\\g<1> \\g<2>\\g<3>', processed_token)
+        # For all kinds of punctuation we need to insert spaces at the correct positions, see the patterns
+        # at the top of this module
+        processed_token = INSERT_SPACE_AFTER_ANYWHERE.sub('\\g<1> ', token)
+        processed_token = INSERT_SPACE_BEFORE_ANYWHERE.sub(' \\g<1>', processed_token)
+        processed_token = INSERT_SPACE_AFTER_IF_BEGINNING.sub('\\g<1> \\g<2>', processed_token)
+        processed_token = INSERT_SPACE_BEFORE_IF_END.sub('\\g<1> \\g<2>', processed_token)
+        processed_token = INSERT_SPACE_BEFORE_IF_END_AND_PUNCT.sub('\\g<1> \\g<2>\\g<3>', processed_token)
 
         return processed_token
 
@@ -205,53 +246,30 @@ class Tokenizer:
         if len(token) <= 1:
             return False
         # possibly a year at the end of a sentence? If yes, we want the dot to be detached
-        # we only consider 4 digit years up to year 2099
-        if re.fullmatch('(1\\d{3})|(20\\d{2})\\.', token):
-            self.freeze_space = True
+        if self.is_year(token):
             return True
-        # a simple cardinal or ordinal number
-        if re.fullmatch('\\d+\\.?', token):
-            return False
-        # a more complex combination of digits and punctuations, e.g. dates and large numbers
-        if re.fullmatch('(\\d+[.,:]\\d+)+[,.]?', token):
-            return False
-        # telephone number or 'kennitala', don't split on hyphen
-        if re.fullmatch('\\d{3}-\\d{4}[,.?:]?', token):
+        # numbers, dates, telephone numbers, hyphenated words etc., see NO_SPLIT_TOKEN
+        if NO_SPLIT_TOKEN.fullmatch(token):
             return False
-        if re.fullmatch('\\d{6}-\\d{4}[,.?:]?', token):
+        if NO_SPLIT_UNIT.match(token.lower()):
             return False
-        # don't split on hyphen if we have a digits pattern with more than one hyphen
-        if re.fullmatch('(\\d+-){2,}\\d+', token):
-            return False
-        # don't split on hyphen for non-digits
-        if re.fullmatch('[^\\d]+-[^\\d]+', token):
-            return False
-        # don't split on slash for small number of chars on each side (digits or letters)
-        if re.fullmatch(WORD_CHAR + '{1,3}/' + WORD_CHAR + '{1,3}', token):
-            return False
-        # special cases - resolve! We need to have simple rules for when to split and when not, the tokenizer
-        # should not have to know too much about the normalizer!
-        if re.match('(millj./)|(.+/klst)|(.+/kwst)|(.+/gwst)|(.+/gw\\.st)|(.+/mwst)|(.+/twst)|(.+/m²)|(.+/m³)'
-                    '|(.+/mm²)|(.+/mm³)|(.+/cm²)|(.+/cm³)|(.+/ferm)', token.lower()):
-            return False
-        # don't split smileys TODO: add more patterns here
-        if re.fullmatch('(:\))|(:\()', token):
-            return False
-        # don't do anything with tokens that look like links and e-mail addresses
-        if re.match('(www)|(http)|@', token):
-            return False
-        # don't do anything with closing tags tokens
-        if re.match('</.+>', token):
+        # links, e-mail addresses and closing tags
+        if NO_SPLIT_PREFIX.match(token):
             return False
         # don't process abbreviations
         if self.is_abbreviation(token):
             return False
-        if self.is_uppercase_abbr(token):
+        # same as is_uppercase_abbr(), the token is not an abbreviation
+        if UPPERCASE_ABBR.match(token):
             return False
         return True
 
+    @staticmethod
+    def is_year(token: str) -> bool:
+        return YEAR_TOKEN.fullmatch(token) is not None
+
     def is_uppercase_abbr(self, token: str) -> bool:
-        return re.match('(' + UPPER_CASE + '\\.)+', token) and not self.is_abbreviation(token)
+        return UPPERCASE_ABBR.match(token) and not self.is_abbreviation(token)
 
     def is_abbreviation(self, token: str) -> bool:
         # is adding the dot for abbr-testing too general?
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from manager.textprocessing_manager import Manager
+from manager.async_manager import AsyncManager
+
+
+class TestAsyncManager(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.manager = Manager()
+        self.async_manager = AsyncManager(self.manager)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.async_manager.close())
+        self.manager.close()
+        self.loop.close()
+
+    def test_transcribe(self):
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. Norðaustanátt og snjókoma NV-til fyrri part dags.'
+        transcribed = self.manager.transcribe(input_text)
+        async_transcribed = self.loop.run_until_complete(self.async_manager.transcribe(input_text))
+        self.assertEqual(self.manager.get_string_representation_transcribed(transcribed, ignore_tags=False),
+                         self.manager.get_string_representation_transcribed(async_transcribed, ignore_tags=False))
+
+    def test_stream(self):
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. Norðaustanátt og snjókoma NV-til fyrri part dags.'
+        sentences = list(self.manager.stream(input_text))
+
+        async def collect():
+            chunks = [input_text[i:i + 7] for i in range(0, len(input_text), 7)]
+            return [sent async for sent in self.async_manager.stream(chunks)]
+
+        async_sentences = self.loop.run_until_complete(collect())
+        self.assertEqual([(sent.start, sent.end) for sent in sentences],
+                         [(sent.start, sent.end) for sent in async_sentences])
+        self.assertEqual([self.manager.get_string_representation_transcribed(sent.tokens) for sent in sentences],
+                         [self.manager.get_string_representation_transcribed(sent.tokens) for sent in async_sentences])
+
+    def test_cancel(self):
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. ' * 50
+
+        async def cancel():
+            task = asyncio.ensure_future(self.async_manager.phrase(input_text))
+            # wait for the phrasing to start, then cancel
+            while not self.async_manager.parser.is_alive():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.loop.run_until_complete(cancel())
+        # the parser working on the cancelled request has been stopped
+        self.assertFalse(self.async_manager.parser.is_alive())
+        phrased = self.loop.run_until_complete(self.async_manager.phrase('Snýst í suðaustan 10-18 m/s'))
+        self.assertEqual('Snýst í suðaustan tíu til átján metrar á sekúndu',
+                         self.manager.get_string_representation_normalized(phrased))
@@ -0,0 +1,41 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from manager.textprocessing_manager import Manager
+from manager.batch_scheduler import BatchScheduler
+from manager.options import ProcessingOptions
+
+
+class TestBatchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Manager()
+        self.scheduler = BatchScheduler(self.manager, max_batch_size=8, max_wait=0.05)
+
+    def tearDown(self):
+        self.scheduler.close()
+        self.manager.close()
+
+    def test_transcribe(self):
+        texts = ['Sunnan 4 m/s', 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu.',
+                 'Norðaustanátt og snjókoma NV-til fyrri part dags.', 'Sunnan 4 m/s'] * 3
+        with ThreadPoolExecutor(len(texts)) as executor:
+            futures = list(executor.map(lambda text: self.scheduler.submit('transcribe', text), texts))
+        for text, future in zip(texts, futures):
+            self.assertEqual(self.manager.get_string_representation_transcribed(self.manager.transcribe(text)),
+                             self.manager.get_string_representation_transcribed(future.result()))
+        stats = self.scheduler.stats()
+        self.assertEqual(len(texts), stats['requests'])
+        self.assertLess(stats['batches'], len(texts))
+
+    def test_unknown_stage(self):
+        self.assertRaises(ValueError, self.scheduler.submit, 'tokenize', 'Sunnan 4 m/s')
+
+    def test_invalid_options(self):
+        invalid = self.scheduler.submit('transcribe', 'Sunnan 4 m/s', options=ProcessingOptions(syllab_symbol=['.']))
+        self.assertRaises(ValueError, invalid.result, 10)
+        # the scheduler keeps processing requests
+        self.assertTrue(self.scheduler.submit('normalize', 'Sunnan 4 m/s').result(10))
+
+
+if __name__ == '__main__':
+    unittest.main()
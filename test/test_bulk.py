@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import unittest
+from manager.bulk import main, process_documents, read_documents
+
+
+class TestBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp_dir.name, 'corpus.txt')
+        with open(self.input_file, 'w', encoding='utf-8') as f:
+            f.write('Sunnan 4 m/s\n\nNorðaustanátt og snjókoma NV-til fyrri part dags.\n')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_documents(self):
+        documents = list(read_documents([self.input_file, self.tmp_dir.name]))
+        self.assertEqual([self.input_file + ':1', self.input_file + ':3', self.input_file],
+                         [doc_id for doc_id, _ in documents])
+
+    def test_unreadable_file(self):
+        documents_dir = os.path.join(self.tmp_dir.name, 'documents')
+        os.mkdir(documents_dir)
+        with open(os.path.join(documents_dir, 'a.txt'), 'wb') as f:
+            f.write('Sunnan \xfe 4 m/s'.encode('latin-1'))
+        with open(os.path.join(documents_dir, 'b.txt'), 'w', encoding='utf-8') as f:
+            f.write('Sunnan 4 m/s')
+        records = [json.loads(record) for record in process_documents(read_documents([documents_dir]),
+                                                                       stages=['clean'])]
+        self.assertEqual([os.path.join(documents_dir, 'a.txt'), os.path.join(documents_dir, 'b.txt')],
+                         [record['id'] for record in records])
+        self.assertIn('error', records[0])
+        self.assertEqual('Sunnan 4 m/s', records[1]['clean'])
+
+    def test_stages(self):
+        output_file = os.path.join(self.tmp_dir.name, 'out.ndjson')
+        main([self.input_file, '--stages', 'clean', 'normalize', '--output', output_file])
+        with open(output_file, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(2, len(records))
+        self.assertEqual('Sunnan fjórir metrar á sekúndu', records[0]['normalized'])
+        self.assertNotIn('transcribed', records[0])
+
+    def test_jobs(self):
+        documents = list(read_documents([self.input_file])) * 5
+        single = list(process_documents(documents, stages=['normalize', 'transcribe']))
+        parallel = list(process_documents(documents, jobs=2, stages=['normalize', 'transcribe']))
+        self.assertEqual(single, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from manager.cache import LRUCache
+from manager.g2p_cache import PersistentG2PCache
+
+
+class TestCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = LRUCache(2)
+        cache.put('og', 'O: G')
+        cache.put('í', 'i:')
+        self.assertEqual('O: G', cache.get('og'))
+        # 'í' is now the least recently used entry
+        cache.put('að', 'a: D')
+        self.assertIsNone(cache.get('í'))
+        self.assertEqual('a: D', cache.get('að'))
+        self.assertEqual((2, 1, 2, 2), tuple(cache.cache_info()))
+
+    def test_invalidate(self):
+        cache = LRUCache(10)
+        cache.put('og', 'O: G')
+        cache.get('og')
+        cache.invalidate()
+        self.assertIsNone(cache.get('og'))
+        self.assertEqual((1, 1, 10, 0), tuple(cache.cache_info()))
+        cache.cache_clear()
+        self.assertEqual((0, 0, 10, 0), tuple(cache.cache_info()))
+
+    def test_disabled(self):
+        cache = LRUCache(0)
+        cache.put('og', 'O: G')
+        self.assertIsNone(cache.get('og'))
+        self.assertEqual(0, len(cache))
+
+
+class TestPersistentG2PCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'g2p_cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_versions(self):
+        key = ('aukvisar', True, False, '', False, '')
+        cache = PersistentG2PCache(self.filename, 'v1')
+        cache.put_many({key: 'ei: k v I s a r'})
+        # a process using other dictionaries does not see or delete the entries of the first one
+        other = PersistentG2PCache(self.filename, 'v2')
+        self.assertEqual({}, other.get_many([key]))
+        other.set_version('v3')
+        self.assertEqual({key: 'ei: k v I s a r'}, cache.get_many([key]))
+        other.discard_stale()
+        self.assertEqual({}, cache.get_many([key]))
+        cache.close()
+        other.close()
@@ -28,6 +28,13 @@ class TestCleaner(unittest.TestCase):
         result_str = tokens.extract_clean_text(result, ignore_tags=False)
         self.assertEqual('Þetta <lang xml:lang="en-GB"> is English </lang>', result_str)
 
+    def test_token_cache(self):
+        manager = Manager()
+        input_text = 'Alltaf að hreinsä allt 🥵 , alltaf að hreinsä'
+        result_str = tokens.extract_clean_text(manager.clean(input_text))
+        self.assertEqual(result_str, tokens.extract_clean_text(manager.clean(input_text)))
+        self.assertGreater(manager.cleaner.cache_info().hits, 0)
+
     def test_html_clean(self):
         manager = Manager()
         input_text = self.get_html_string()
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from manager.iceparser_worker import IceParserWorker, AsyncIceParserWorker
+
+# answers each line like IceParser, one line per sentence, but skips sentences containing 'skip'
+FAKE_PARSER = '''
+import sys
+for line in sys.stdin:
+    if 'skip' not in line:
+        sys.stdout.write('[ ' + line.strip() + ' ]\\n')
+        sys.stdout.flush()
+'''
+
+
+class TestIceParserWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fake_parser = os.path.join(self.tmp_dir, 'fake_parser.py')
+        with open(self.fake_parser, 'w') as f:
+            f.write(FAKE_PARSER)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def create_worker(self) -> IceParserWorker:
+        worker = IceParserWorker(timeout=30)
+        worker.command = [sys.executable, self.fake_parser]
+        return worker
+
+    def test_round_trip(self):
+        worker = self.create_worker()
+        self.assertEqual(['[ hundur nken ]', '[ köttur nken ]'], worker.parse(['hundur nken', '', 'köttur nken']))
+        pid = worker.process.pid
+        self.assertEqual(['[ hestur nken ]'], worker.parse(['hestur nken']))
+        self.assertEqual(pid, worker.process.pid)
+        worker.stop()
+
+    def test_missing_line(self):
+        worker = self.create_worker()
+        start = time.monotonic()
+        with self.assertRaises(RuntimeError):
+            worker.parse(['hundur nken', 'skip nken', 'köttur nken'])
+        # the mismatch is found without waiting for the timeout, and the parser is stopped
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertFalse(worker.is_alive())
+        # no output of the failed call is read as the answer to the next call
+        self.assertEqual(['[ hestur nken ]'], worker.parse(['hestur nken']))
+        worker.stop()
+
+    def test_async_missing_line(self):
+        worker = AsyncIceParserWorker(timeout=30)
+        worker.command = [sys.executable, self.fake_parser]
+
+        async def parse_twice():
+            with self.assertRaises(RuntimeError):
+                await worker.parse(['hundur nken', 'skip nken'])
+            self.assertFalse(worker.is_alive())
+            parsed = await worker.parse(['hestur nken'])
+            await worker.stop()
+            return parsed
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(['[ hestur nken ]'], loop.run_until_complete(parse_twice()))
+        finally:
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import unittest
+
+# seconds allowed for 'import manager.textprocessing_manager' in a fresh interpreter
+IMPORT_TIME_BUDGET = 1.5
+# packages that load models, lexicons or torch on import, only imported when the stage using them runs
+DEFERRED_PACKAGES = ['ice_g2p', 'fairseq', 'torch', 'reynir_correct', 'phrasing', 'regina_normalizer']
+
+IMPORT_SCRIPT = '''
+import sys
+import time
+start = time.perf_counter()
+import manager.textprocessing_manager
+print(time.perf_counter() - start)
+print(' '.join(name for name in sys.modules if name.split('.')[0] in sys.argv[1:]))
+'''
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_time(self):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT] + DEFERRED_PACKAGES, check=True,
+                                stdout=subprocess.PIPE, encoding='utf-8').stdout.split('\n')
+        import_time = float(output[0])
+        self.assertEqual('', output[1], 'heavy packages imported with the manager package')
+        self.assertLess(import_time, IMPORT_TIME_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
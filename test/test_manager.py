@@ -1,6 +1,8 @@
 import unittest
+import os
 import pprint
-from manager.textprocessing_manager import Manager
+from concurrent.futures import ThreadPoolExecutor
+from manager.textprocessing_manager import Manager, SentenceSplitter
 
 
 class TestManager(unittest.TestCase):
@@ -29,4 +31,173 @@ class TestManager(unittest.TestCase):
         result = manager.get_json_representation(processed)
         for elem in result:
             pprint.pprint(elem)
-        self.assertEqual(11, len(result))
\ No newline at end of file
+        self.assertEqual(11, len(result))
+
+    def test_persistent_parser(self):
+        manager = Manager()
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu, en norðaustanátt og snjókoma NV-til fyrri part dags.'
+        phrased = manager.get_string_representation_normalized(manager.phrase(input_text), ignore_tags=False)
+        pid = manager.phrasing.parser.process.pid
+        self.assertEqual(phrased, manager.get_string_representation_normalized(manager.phrase(input_text),
+                                                                                ignore_tags=False))
+        self.assertEqual(pid, manager.phrasing.parser.process.pid)
+        # a dead parser is restarted on the next call
+        manager.phrasing.parser.process.kill()
+        manager.phrasing.parser.process.wait()
+        self.assertEqual(phrased, manager.get_string_representation_normalized(manager.phrase(input_text),
+                                                                                ignore_tags=False))
+        self.assertNotEqual(pid, manager.phrasing.parser.process.pid)
+        manager.close()
+
+    def test_concurrent_phrasing(self):
+        manager = Manager()
+        input_texts = ['Snýst í suðaustan 10-18 m/s og hlýnar með rigningu, en norðaustanátt og snjókoma NV-til.',
+                       'Ég vil hringja í 557 1234, það er síminn hjá Guðmundi.',
+                       'Þetta voru ca. 5 mín. en leikurinn fór 5-2.'] * 4
+        cwd = os.getcwd()
+        expected = [manager.get_string_representation_normalized(manager.phrase(text), ignore_tags=False)
+                    for text in input_texts]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            phrased = list(executor.map(manager.phrase, input_texts))
+        result = [manager.get_string_representation_normalized(tokens, ignore_tags=False) for tokens in phrased]
+        self.assertEqual(expected, result)
+        self.assertEqual(cwd, os.getcwd())
+        manager.close()
+
+    def test_transcribe_batch(self):
+        manager = Manager()
+        input_texts = ['Snýst í suðaustan 10-18 m/s og hlýnar með rigningu.',
+                       'hlaupa í burtu í dag',
+                       'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu.',
+                       'Þetta (e. is English)']
+        expected = [manager.get_string_representation_transcribed(manager.transcribe(text), ignore_tags=False)
+                    for text in input_texts]
+        transcribed = manager.transcribe_batch(input_texts)
+        self.assertEqual(len(input_texts), len(transcribed))
+        result = [manager.get_string_representation_transcribed(tokens, ignore_tags=False) for tokens in transcribed]
+        self.assertEqual(expected, result)
+        normalized = manager.normalize_batch(input_texts)
+        self.assertEqual('tíu til átján metrar á sekúndu',
+                         manager.get_string_representation_normalized(normalized[2][3:5]))
+
+    def test_process(self):
+        manager = Manager()
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu, en norðaustanátt og snjókoma NV-til.'
+        processed = manager.process(input_text)
+        self.assertEqual(manager.get_string_representation_clean(manager.clean(input_text)),
+                         manager.get_string_representation_clean(processed.clean))
+        self.assertEqual(manager.get_string_representation_normalized(manager.normalize(input_text)),
+                         manager.get_string_representation_normalized(processed.normalized))
+        self.assertEqual(manager.get_string_representation_normalized(manager.phrase(input_text), False),
+                         manager.get_string_representation_normalized(processed.phrased, False))
+        self.assertEqual(manager.get_string_representation_transcribed(manager.transcribe(input_text), False),
+                         manager.get_string_representation_transcribed(processed.transcribed, False))
+        processed = manager.process(input_text, stages=('clean', 'normalize'))
+        self.assertIsNone(processed.phrased)
+        self.assertIsNone(processed.transcribed)
+        self.assertRaises(ValueError, manager.process, input_text, stages=('tokenize',))
+
+    def test_token_stages(self):
+        manager = Manager()
+        input_text = 'þessi texti en engir aukvisar, 10-18 m/s'
+        clean = manager.clean(input_text)
+        normalized = manager.normalize_tokens(clean)
+        self.assertEqual(manager.get_string_representation_normalized(manager.normalize(input_text)),
+                         manager.get_string_representation_normalized(normalized))
+        phrased = manager.phrase_tokens(normalized)
+        # phrasing the same normalized list again gives the same result
+        self.assertEqual(manager.get_string_representation_normalized(phrased, False),
+                         manager.get_string_representation_normalized(manager.phrase_tokens(normalized), False))
+        transcribed = manager.transcribe_tokens(phrased)
+        self.assertEqual(manager.get_string_representation_transcribed(manager.transcribe(input_text)),
+                         manager.get_string_representation_transcribed(transcribed))
+        # re-transcribe after a change in the custom dictionary, without cleaning and normalizing again
+        manager.set_g2p_custom_dict({'texti': 't_h E x s t I', 'engir': '9 N k v I r'})
+        transcribed = manager.transcribe_tokens(phrased)
+        self.assertTrue(manager.get_string_representation_transcribed(transcribed).startswith(
+            'T E s I t_h E x s t I E n 9 N k v I r 9i: k v I s a r'))
+
+    def test_stream(self):
+        manager = Manager()
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. Norðaustanátt og snjókoma NV-til fyrri part dags.'
+        transcribed = manager.transcribe(input_text)
+        sentences = list(manager.stream(input_text))
+        self.assertEqual(2, len(sentences))
+        self.assertEqual(manager.get_transcribed_sentence_representation(transcribed),
+                         [manager.get_string_representation_transcribed(sent.tokens) for sent in sentences])
+        self.assertEqual('Norðaustanátt', input_text[sentences[1].start:sentences[1].start + 13])
+        self.assertEqual(len(input_text), sentences[1].end)
+        # chunks split within words give the same result
+        chunks = [input_text[i:i + 7] for i in range(0, len(input_text), 7)]
+        chunked = list(manager.stream(chunks))
+        self.assertEqual([(sent.start, sent.end) for sent in sentences], [(sent.start, sent.end) for sent in chunked])
+        self.assertEqual([manager.get_string_representation_transcribed(sent.tokens) for sent in sentences],
+                         [manager.get_string_representation_transcribed(sent.tokens) for sent in chunked])
+
+    def test_stream_single_characters(self):
+        manager = Manager()
+        input_text = 'Ég hitti Hr. Jón í gær. Hann kom kl. 5. Það var t.d. gott. Sbr. Jón. Árið 1982. Hún fór.'
+        sentences = list(manager.stream(input_text, phrasing=False))
+        chunked = list(manager.stream(list(input_text), phrasing=False))
+        self.assertEqual([(sent.start, sent.end) for sent in sentences], [(sent.start, sent.end) for sent in chunked])
+        self.assertEqual([manager.get_string_representation_transcribed(sent.tokens) for sent in sentences],
+                         [manager.get_string_representation_transcribed(sent.tokens) for sent in chunked])
+
+    def test_stream_without_punctuation(self):
+        manager = Manager()
+        input_text = ' '.join(['orð'] * 2000)
+        split_calls = []
+        split_into_sentences = manager.split_into_sentences
+
+        def count_split(text, html=False):
+            split_calls.append(text)
+            return split_into_sentences(text, html)
+
+        manager.split_into_sentences = count_split
+        splitter = SentenceSplitter(manager)
+        for char in input_text:
+            self.assertEqual([], splitter.feed(char))
+        # the unfinished sentence is not cleaned and tokenized again for each chunk
+        self.assertEqual([], split_calls)
+        self.assertEqual(1, len(splitter.finish()))
+        self.assertEqual(1, len(split_calls))
+
+    def test_lazy_components(self):
+        manager = Manager()
+        self.assertEqual({}, manager.components)
+        normalized = manager.normalize('Snýst í suðaustan 10-18 m/s')
+        self.assertEqual('Snýst í suðaustan tíu til átján metrar á sekúndu',
+                         manager.get_string_representation_normalized(normalized))
+        self.assertNotIn('g2p', manager.components)
+        self.assertNotIn('spellchecker', manager.components)
+        manager.set_g2p_syllab_symbol('.')
+        self.assertNotIn('g2p', manager.components)
+        manager.warm_up(stages=['transcribe'])
+        self.assertIn('g2p', manager.components)
+        self.assertEqual('.', manager.options.syllab_symbol)
+
+    def test_transcribe_parallel(self):
+        manager = Manager(processes=2)
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. Norðaustanátt og snjókoma NV-til fyrri part dags. ' * 5
+        transcribed = manager.transcribe(input_text)
+        parallel = manager.transcribe_parallel(input_text, group_size=20)
+        manager.close()
+        self.assertEqual(manager.get_string_representation_transcribed(transcribed, ignore_tags=False),
+                         manager.get_string_representation_transcribed(parallel, ignore_tags=False))
+        self.assertEqual([(tok.token_index, tok.start, tok.end) for tok in transcribed if hasattr(tok, 'start')],
+                         [(tok.token_index, tok.start, tok.end) for tok in parallel if hasattr(tok, 'start')])
+
+    def test_sentence_cache(self):
+        manager = Manager()
+        cached_manager = Manager(sentence_cache_size=100)
+        input_text = 'Sunnan 4 m/s. Snýst í suðaustan 10-18 m/s og hlýnar með rigningu. Sunnan 4 m/s.'
+        transcribed = manager.transcribe(input_text)
+        cached_manager.transcribe(input_text)
+        cached = cached_manager.transcribe(input_text)
+        self.assertEqual(manager.get_string_representation_transcribed(transcribed, ignore_tags=False),
+                         manager.get_string_representation_transcribed(cached, ignore_tags=False))
+        self.assertEqual([(tok.token_index, tok.start, tok.end) for tok in transcribed if hasattr(tok, 'start')],
+                         [(tok.token_index, tok.start, tok.end) for tok in cached if hasattr(tok, 'start')])
+        self.assertGreater(cached_manager.sentence_cache_info().hits, 0)
+        manager.close()
+        cached_manager.close()
@@ -1,5 +1,6 @@
 import unittest
 import os
+from concurrent.futures import ThreadPoolExecutor
 from manager.textprocessing_manager import Manager
 import manager.tokens_manager as tokens
 
@@ -22,6 +23,24 @@ class TestNormalizer(unittest.TestCase):
         for elem in normalized:
             print(elem.to_json())
 
+    def test_concurrent_normalize(self):
+        manager = Manager()
+        texts = ['Snýst í suðaustan 10-18 m/s og hlýnar með rigningu.', 'Jón, f. 4. apríl 1927, d. 10. maí 2010.',
+                 'Hún fæddist árið 1982. Það var t.d. 5 stiga frost.']
+        expected = [tokens.extract_normalized_text(manager.normalize(text)) for text in texts]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda text: tokens.extract_normalized_text(manager.normalize(text)),
+                                        texts * 10))
+        self.assertEqual(expected * 10, results)
+
+    def test_sentence_cache(self):
+        manager = Manager()
+        input_text = 'Snýst í suðaustan 10-18 m/s og hlýnar með rigningu.'
+        first = tokens.extract_normalized_text(manager.normalize(input_text))
+        hits = manager.normalizer.cache_info().hits
+        self.assertEqual(first, tokens.extract_normalized_text(manager.normalize(input_text)))
+        self.assertGreater(manager.normalizer.cache_info().hits, hits)
+
     def test_normalize_denom(self):
         manager = Manager()
         input_text = '5/6'
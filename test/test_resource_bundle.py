@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from manager.resource_bundle import write_bundle, load_bundle, files_stamp, files_checksum
+
+
+class TestResourceBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'resources.bundle')
+        self.resource_file = os.path.join(self.tmp_dir, 'abbreviations.txt')
+        self.write_resource_file('ca.\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_resource_file(self, content: str):
+        with open(self.resource_file, 'w') as f:
+            f.write(content)
+
+    def write_bundle(self, pron_dict: dict, abbreviations: set, nonending: set):
+        resource_files = [self.resource_file]
+        write_bundle(self.filename, files_stamp(resource_files), files_checksum(resource_files), pron_dict,
+                     abbreviations, nonending)
+
+    def test_lookup(self):
+        pron_dict = {'hlaupa': 'l_0 9i: p a', 'á': 'au:', 'ör': '9 r', 'texti': 't_h E x s t I'}
+        abbreviations = {'ca.', 'þ.e.', 'o.s.frv.'}
+        nonending = {'hr.', 'u.þ.b.'}
+        self.write_bundle(pron_dict, abbreviations, nonending)
+        bundle = load_bundle(self.filename, [self.resource_file])
+        self.assertEqual(files_checksum([self.resource_file]), bundle.checksum)
+        self.assertEqual(pron_dict, dict(bundle.pron_dict))
+        self.assertEqual('au:', bundle.pron_dict['á'])
+        self.assertEqual('', bundle.pron_dict.get('hlaup', ''))
+        self.assertNotIn('ö', bundle.pron_dict)
+        self.assertIn('þ.e.', bundle.abbreviations)
+        self.assertNotIn('hr.', bundle.abbreviations)
+        self.assertEqual(nonending, set(bundle.nonending_abbreviations))
+
+    def test_stale_bundle(self):
+        self.write_bundle({'á': 'au:'}, set(), set())
+        self.write_resource_file('ca.\nþ.e.\n')
+        self.assertIsNone(load_bundle(self.filename, [self.resource_file]))
+        self.assertIsNone(load_bundle(os.path.join(self.tmp_dir, 'missing.bundle'), [self.resource_file]))
+        self.assertIsNone(load_bundle(self.filename, [os.path.join(self.tmp_dir, 'missing.txt')]))
+
+    def test_touched_resource_file(self):
+        self.write_bundle({'á': 'au:'}, set(), set())
+        stamp = files_stamp([self.resource_file])
+        stat = os.stat(self.resource_file)
+        os.utime(self.resource_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertNotEqual(stamp, files_stamp([self.resource_file]))
+        # the contents are unchanged, the checksum still matches
+        self.assertIsNotNone(load_bundle(self.filename, [self.resource_file]))
+
+
+if __name__ == '__main__':
+    unittest.main()
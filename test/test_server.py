@@ -0,0 +1,55 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from manager.textprocessing_manager import Manager
+from manager.server import ProcessingService, create_server
+
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = Manager()
+        cls.server = create_server(ProcessingService(cls.manager, workers=2, max_request_size=1024), port=0)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.manager.close()
+
+    def post(self, path, content):
+        request = urllib.request.Request(self.url + path, data=json.dumps(content).encode('utf-8'))
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def test_health(self):
+        with urllib.request.urlopen(self.url + '/health') as response:
+            self.assertEqual('ok', json.loads(response.read().decode('utf-8'))['status'])
+
+    def test_normalize(self):
+        response = self.post('/normalize', {'text': 'Sunnan 4 m/s'})
+        self.assertEqual('Sunnan fjórir metrar á sekúndu', response['text'])
+        self.assertEqual('Sunnan', response['tokens'][0]['name'])
+
+    def test_invalid_requests(self):
+        with self.assertRaises(urllib.error.HTTPError) as e:
+            self.post('/transcribe', {'text': 'Sunnan 4 m/s', 'options': {'no_such_option': True}})
+        self.assertEqual(400, e.exception.code)
+        with self.assertRaises(urllib.error.HTTPError) as e:
+            self.post('/transcribe', {'text': 'Sunnan 4 m/s', 'options': {'syllab_symbol': ['.']}})
+        self.assertEqual(400, e.exception.code)
+        with self.assertRaises(urllib.error.HTTPError) as e:
+            self.post('/clean', {'text': 'Sunnan 4 m/s', 'html': 'false'})
+        self.assertEqual(400, e.exception.code)
+        with self.assertRaises(urllib.error.HTTPError) as e:
+            self.post('/normalize', {'text': 'a' * 2048})
+        self.assertEqual(413, e.exception.code)
+
+
+if __name__ == '__main__':
+    unittest.main()
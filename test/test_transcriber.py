@@ -1,6 +1,11 @@
 import unittest
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from manager.textprocessing_manager import Manager
+from manager.options import ProcessingOptions
 import manager.tokens_manager as tokens
 
 
@@ -55,6 +60,109 @@ class TestTranscriber(unittest.TestCase):
         result_str = tokens.extract_transcribed_text(transcribed)
         self.assertEqual('T E s I t_h E x s t I E n 9 N k v I r 9i: k v I s a r', result_str)
 
+    def test_custom_dict_after_oov(self):
+        manager = Manager()
+        # transcribed by the g2p model first
+        manager.transcribe('blöbbsi')
+        manager.set_g2p_custom_dict({'blöbbsi': 'p l 9 p s I'})
+        transcribed = manager.transcribe('blöbbsi')
+        self.assertEqual('p l 9 p s I', tokens.extract_transcribed_text(transcribed))
+
+    def test_shared_model(self):
+        manager = Manager(custom_pron_dict=self.get_custom_dict())
+        other_manager = Manager()
+        test_string = 'þessi texti en engir aukvisar'
+        custom_transcribed = tokens.extract_transcribed_text(manager.transcribe(test_string))
+        transcribed = tokens.extract_transcribed_text(other_manager.transcribe(test_string))
+        self.assertEqual('T E s I t_h E x s t I E n 9 N k v I r 9i: k v I s a r', custom_transcribed)
+        self.assertNotEqual(custom_transcribed, transcribed)
+        # resources and models are only loaded once
+        self.assertIs(manager.resources, other_manager.resources)
+        self.assertIs(manager.g2p.g2p.g2p.g2p_model, other_manager.g2p.g2p.g2p.g2p_model)
+        self.assertIsNot(manager.g2p.g2p, other_manager.g2p.g2p)
+
+    def test_call_options(self):
+        manager = Manager()
+        test_string = 'hlaupa'
+        options = ProcessingOptions(syllab_symbol='.', phrasing=False)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda opt: tokens.extract_transcribed_text(
+                manager.transcribe(test_string, options=opt)), [options, ProcessingOptions(phrasing=False)] * 4))
+        self.assertEqual(['l_0 9i: . p a', 'l_0 9i: p a'] * 4, results)
+        # the default settings of the manager are not changed
+        self.assertEqual('', manager.options.syllab_symbol)
+
+    def test_word_cache(self):
+        manager = Manager()
+        test_string = 'hlaupa og hlaupa og engir'
+        transcribed = manager.transcribe(test_string)
+        self.assertEqual(3, manager.g2p.cache_info().misses)
+        manager.transcribe(test_string)
+        self.assertEqual(3, manager.g2p.cache_info().hits)
+        # different settings are cached separately
+        manager.set_g2p_syllab_symbol('.')
+        transcribed = manager.transcribe(test_string)
+        self.assertEqual(6, manager.g2p.cache_info().misses)
+        self.assertTrue(tokens.extract_transcribed_text(transcribed).startswith('l_0 9i: . p a'))
+        # the cache is invalidated when the dictionaries change
+        manager.set_g2p_syllab_symbol('')
+        manager.set_g2p_custom_dict(self.get_custom_dict())
+        transcribed = manager.transcribe(test_string)
+        self.assertTrue(tokens.extract_transcribed_text(transcribed).endswith('9 N k v I r'))
+
+    def test_oov_batch(self):
+        manager = Manager()
+        test_string = 'engir aukvisar hjá Grammatek né í Kjölfarsvík'
+        # count the inference calls of the g2p models and the words checked for being out of vocabulary
+        translated = []
+        g2p_models = [model.g2p_model for model in (manager.g2p.g2p.g2p, manager.g2p.g2p.g2p_foreign)]
+        for g2p_model in g2p_models:
+            g2p_model.translate = partial(self.count_translate, g2p_model.translate, translated)
+        find_oov = manager.g2p.find_oov
+        checked = []
+        manager.g2p.find_oov = lambda words: checked.append(words) or find_oov(words)
+        try:
+            batched = manager.transcribe_batch([test_string, 'aukvisar í Kjölfarsvík'])
+            # at most one inference call per model for 'aukvisar', 'grammatek' and 'kjölfarsvík'
+            self.assertLessEqual(len(translated), 2)
+            self.assertGreater(sum(translated), len(translated))
+            # cached words are neither checked nor transcribed again
+            calls = len(translated)
+            manager.transcribe_batch(['aukvisar í Kjölfarsvík'])
+            self.assertEqual(set(), checked[-1])
+            self.assertEqual(calls, len(translated))
+        finally:
+            for g2p_model in g2p_models:
+                del g2p_model.translate
+        manager = Manager()
+        manager.g2p.oov_batch_size = 0
+        transcribed = manager.transcribe(test_string)
+        self.assertEqual(tokens.extract_transcribed_text(transcribed), tokens.extract_transcribed_text(batched[0]))
+
+    @staticmethod
+    def count_translate(translate, translated: list, inputs: list) -> list:
+        translated.append(len(inputs))
+        return translate(inputs)
+
+    def test_persistent_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        cache_file = os.path.join(cache_dir, 'g2p_cache.db')
+        manager = Manager()
+        manager.set_g2p_persistent_cache(cache_file)
+        test_string = 'engir aukvisar hjá Grammatek'
+        expected = tokens.extract_transcribed_text(manager.transcribe(test_string))
+        # a new manager, e.g. in another process, finds the oov-words in the persistent cache
+        manager = Manager()
+        manager.set_g2p_persistent_cache(cache_file)
+        self.assertIn(('aukvisar', True, False, '', False, ''),
+                      manager.g2p.persistent_cache.get_many([('aukvisar', True, False, '', False, '')]))
+        self.assertEqual(expected, tokens.extract_transcribed_text(manager.transcribe(test_string)))
+        # a changed core dictionary discards the stored transcriptions
+        manager.g2p.set_core_pron_dict({'engir': 'ei N k I r'})
+        self.assertEqual({}, manager.g2p.persistent_cache.get_many([('aukvisar', True, False, '', False, '')]))
+        manager.set_g2p_persistent_cache(None)
+        shutil.rmtree(cache_dir)
+
     def test_longer_text(self):
         manager = Manager()
         test_string = self.get_longer_text()
@@ -1,8 +1,14 @@
 import unittest
 import os
+import time
 from manager.textprocessing_manager import Manager
+from manager.settings import ManagerResources
+from manager.tts_tokenizer import Tokenizer
 import manager.tokens_manager as tokens
 
+# microseconds allowed per token for classifying and splitting number- and symbol-heavy tokens
+SPECIAL_CHARACTERS_BUDGET = 50
+
 
 class TestTokenizer(unittest.TestCase):
 
@@ -14,4 +20,36 @@ class TestTokenizer(unittest.TestCase):
         #print(str(result))
         #print(result_str)
         tokenized = manager.tokenize_from_list(result)
-        print(str(tokenized))
\ No newline at end of file
+        print(str(tokenized))
+
+    def test_special_characters_benchmark(self):
+        resources = ManagerResources()
+        tokenizer = Tokenizer(resources.abbreviations, resources.nonending_abbreviations)
+        token_list = ('Snýst í suðaustan 10-18 m/s, hiti 3,5 til 12.000 stig 1.5.2020 kl. 20:15 s. 555-1234 '
+                      'kt. 010203-2345 (5%) "Halló," sagði hún NV-til 50 EUR/t 3/4 www.ruv.is 1982. :)').split() * 200
+        self.assertEqual('10 - 18', tokenizer.process_special_characters('10-18'))
+        self.assertEqual('( 5 % )', tokenizer.process_special_characters('(5%)'))
+        start = time.perf_counter()
+        for token in token_list:
+            tokenizer.process_special_characters(token)
+        per_token = (time.perf_counter() - start) / len(token_list) * 1e6
+        self.assertLess(per_token, SPECIAL_CHARACTERS_BUDGET)
+
+    def test_detect_sentences_scaling(self):
+        resources = ManagerResources()
+        tokenizer = Tokenizer(resources.abbreviations, resources.nonending_abbreviations)
+        # a book-sized input without any sentence ending, the worst case for building sentences
+        words = ['Snýst', 'í', 'suðaustan', '10-18', 'm/s', 'og', 'hlýnar', 'með', 'rigningu']
+        timings = []
+        for size in (40000, 160000):
+            text = ' '.join(words * (size // len(words)))
+            start = time.perf_counter()
+            sentences = tokenizer.detect_sentences(text)
+            timings.append(time.perf_counter() - start)
+            self.assertEqual(1, len(sentences))
+        # linear scaling, with some tolerance for timing noise
+        self.assertLess(timings[1], 6 * timings[0])
+
+
+if __name__ == '__main__':
+    unittest.main()